@@ -90,10 +90,11 @@ def save_data(financial_list, dividend_list, first_save=True):
     if financial_list:
         df = pd.concat(financial_list, ignore_index=True)
         # 第一次保存带表头，之后追加
+        # 不使用 utf-8-sig: 追加模式下每批都会在文件中间写入 BOM
         df.to_csv(DATA_DIR / "chuangye_financial_indicators.csv", 
                   mode='w' if first_save else 'a', 
                   header=first_save, 
-                  index=False, encoding='utf-8-sig')
+                  index=False)
         print(f"已保存 {len(df)} 条财务指标数据")
     
     if dividend_list:
@@ -101,7 +102,7 @@ def save_data(financial_list, dividend_list, first_save=True):
         df.to_csv(DATA_DIR / "chuangye_dividend.csv", 
                   mode='w' if first_save else 'a', 
                   header=first_save, 
-                  index=False, encoding='utf-8-sig')
+                  index=False)
         print(f"已保存 {len(df)} 条分红数据")
 
 if __name__ == "__main__":
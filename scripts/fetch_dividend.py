@@ -6,9 +6,19 @@
 import akshare as ak
 import pandas as pd
 from pathlib import Path
+import os
 import sys
 
+# Parquet (列式 + zstd 压缩) 读写远快于 CSV, pyarrow 不可用时退回 CSV
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
 DATA_DIR = Path("/home/liujerry/金融数据/fundamentals")
+# 设置 WANT_CSV=1 时额外输出 CSV (供 Excel 等工具查看)
+WANT_CSV = os.environ.get("WANT_CSV") == "1"
 
 def get_dividend(stock_code):
     """获取单只股票分红数据"""
@@ -58,8 +68,13 @@ def save_dividends(dividend_list, filename):
         return
     df = pd.concat(dividend_list, ignore_index=True)
     output_path = DATA_DIR / filename
-    df.to_csv(output_path, index=False, encoding='utf-8-sig')
-    print(f"已保存 {len(df)} 条分红数据到 {output_path}")
+    if HAS_PARQUET:
+        parquet_path = output_path.with_suffix('.parquet')
+        df.to_parquet(parquet_path, compression='zstd', index=False)
+        print(f"已保存 {len(df)} 条分红数据到 {parquet_path}")
+    if WANT_CSV or not HAS_PARQUET:
+        df.to_csv(output_path, index=False)
+        print(f"已保存 {len(df)} 条分红数据到 {output_path}")
 
 if __name__ == "__main__":
     # 测试单只股票
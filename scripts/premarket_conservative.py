@@ -5,11 +5,19 @@
 """
 
 import baostock as bs
+import numpy as np
 import pandas as pd
 import json
 import sys
 from datetime import datetime
 
+# bottleneck 的滑动均值/标准差为 C 实现的单遍算法, 未安装时退回 pandas rolling
+try:
+    import bottleneck as bn
+    HAS_BOTTLENECK = True
+except ImportError:
+    HAS_BOTTLENECK = False
+
 # 自选股列表
 WATCHLIST = [
     ('300276', 'sz', '三丰智能'),
@@ -27,18 +35,30 @@ WATCHLIST = [
     ('300456', 'sz', '赛微电子'),
 ]
 
+def rolling_mean(s, window):
+    """滑动均值 (等价于 rolling(window).mean())"""
+    if HAS_BOTTLENECK and len(s) >= window:
+        return pd.Series(bn.move_mean(s.to_numpy(dtype=np.float64), window), index=s.index)
+    return s.rolling(window).mean()
+
+def rolling_std(s, window):
+    """滑动标准差 (等价于 rolling(window).std(), ddof=1)"""
+    if HAS_BOTTLENECK and len(s) >= window:
+        return pd.Series(bn.move_std(s.to_numpy(dtype=np.float64), window, ddof=1), index=s.index)
+    return s.rolling(window).std()
+
 def calc_rsi(prices, period=14):
     """计算RSI"""
     delta = prices.diff()
-    gain = delta.where(delta > 0, 0).rolling(period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(period).mean()
+    gain = rolling_mean(delta.where(delta > 0, 0), period)
+    loss = rolling_mean(-delta.where(delta < 0, 0), period)
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
 def calc_bollinger(prices, period=20):
     """计算布林带"""
-    sma = prices.rolling(period).mean()
-    std = prices.rolling(period).std()
+    sma = rolling_mean(prices, period)
+    std = rolling_std(prices, period)
     return sma, sma + 2*std, sma - 2*std
 
 def analyze_stock(code, exchange, name):
@@ -65,18 +85,21 @@ def analyze_stock(code, exchange, name):
         return None
     
     df = pd.DataFrame(data, columns=['date', 'close'])
-    df['close'] = pd.to_numeric(df['close'], errors='coerce').dropna()
+    # 只做一次类型转换和去空值, 各指标共用同一份收盘价序列
+    close = pd.to_numeric(df['close'], errors='coerce').dropna().reset_index(drop=True)
     
-    if len(df) < 20:
+    if len(close) < 20:
         return None
     
     # 计算指标
-    rsi = calc_rsi(df['close'])
-    rsi_val = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
-    
-    sma, upper, lower = calc_bollinger(df['close'])
-    price = df['close'].iloc[-1]
-    lower_val = lower.iloc[-1] if not pd.isna(lower.iloc[-1]) else price
+    rsi = calc_rsi(close)
+    rsi_last = rsi.iat[-1]
+    rsi_val = rsi_last if not pd.isna(rsi_last) else 50
+    
+    sma, upper, lower = calc_bollinger(close)
+    price = close.iat[-1]
+    lower_last = lower.iat[-1]
+    lower_val = lower_last if not pd.isna(lower_last) else price
     
     # 保守策略判断
     signal = '观望'
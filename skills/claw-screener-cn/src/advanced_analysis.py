@@ -185,9 +185,15 @@ class CarlsonQualityScore:
         # 限制范围
         return min(100, int(round(score)))
     
-    def get_rating(self) -> str:
-        """获取评级"""
-        score = self.compute_total_score()
+    def get_rating(self, score: int = None) -> str:
+        """
+        获取评级
+        
+        Args:
+            score: 已算好的 compute_total_score() 结果, 不传时重新计算
+        """
+        if score is None:
+            score = self.compute_total_score()
         if score >= 80:
             return "A+ (优秀)"
         elif score >= 60:
@@ -353,7 +359,7 @@ def analyze_fundamental(financial_data: Dict, price_data: Dict = None) -> Dict:
     # Carlson 评分
     carlson = CarlsonQualityScore(financial_data, price_data)
     carlson_score = carlson.compute_total_score()
-    carlson_rating = carlson.get_rating()
+    carlson_rating = carlson.get_rating(carlson_score)
     
     # DCF 估值
     dcf = DCFValuation(financial_data, price_data)
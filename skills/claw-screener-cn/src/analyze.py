@@ -3,14 +3,16 @@
 A股股票分析器 - 个股深度分析
 """
 import sys
-import json
 import argparse
 
+import pandas as pd
+
 sys.path.insert(0, __file__.rsplit('/', 1)[0])
 
 from data_fetcher import AStockDataFetcher
 from technical_indicators import calculate_williams_r, calculate_rsi, calculate_bollinger_bands, calculate_macd, calculate_kdj
 from formulas import FormulaEngine, FinancialData
+from json_io import dump_json
 
 
 def analyze_single_stock(stock_code: str, name: str = "") -> dict:
@@ -56,27 +58,24 @@ def analyze_single_stock(stock_code: str, name: str = "") -> dict:
     
     # 计算技术指标
     print("计算技术指标...")
-    df['williams_r'] = calculate_williams_r(
-        df['high'].astype(float),
-        df['low'].astype(float),
-        df['close'].astype(float),
-        period=14
-    )
+    # 价格列以 float32 存储, 只转换一次 float64 供各指标共用
+    high = df['high'].astype(float)
+    low = df['low'].astype(float)
+    close = df['close'].astype(float)
+    
+    # 指标列先收集到字典, 最后一次性拼接, 避免逐列插入造成 DataFrame 碎片化
+    feat = {}
+    feat['williams_r'] = calculate_williams_r(high, low, close, period=14)
+    
+    feat['rsi'] = calculate_rsi(close, period=14)
     
-    df['rsi'] = calculate_rsi(df['close'].astype(float), period=14)
+    feat['macd_dif'], feat['macd_dea'], feat['macd'] = calculate_macd(close)
     
-    df['macd_dif'], df['macd_dea'], df['macd'] = calculate_macd(df['close'].astype(float))
+    feat['kdj_k'], feat['kdj_d'], feat['kdj_j'] = calculate_kdj(high, low, close)
     
-    df['kdj_k'], df['kdj_d'], df['kdj_j'] = calculate_kdj(
-        df['high'].astype(float),
-        df['low'].astype(float),
-        df['close'].astype(float)
-    )
+    feat['bb_middle'], feat['bb_upper'], feat['bb_lower'] = calculate_bollinger_bands(close)
     
-    middle, upper, lower = calculate_bollinger_bands(df['close'].astype(float))
-    df['bb_middle'] = middle
-    df['bb_upper'] = upper
-    df['bb_lower'] = lower
+    df = pd.concat([df, pd.DataFrame(feat, index=df.index)], axis=1)
     
     # 获取最新数据
     latest = df.iloc[-1]
@@ -268,8 +267,7 @@ def main():
     
     # 保存到文件
     if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        dump_json(result, args.output)
         print(f"\n结果已保存到: {args.output}")
 
 
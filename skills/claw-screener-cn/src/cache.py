@@ -5,6 +5,7 @@ import os
 import json
 import pickle
 import hashlib
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Any, Optional
@@ -69,15 +70,38 @@ class CacheManager:
             是否成功
         """
         cache_path = self._get_cache_path(key)
+        # 先写临时文件再原子替换, 多线程同时写同一键时读者不会读到写了一半的文件
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
         
         try:
-            with open(cache_path, 'wb') as f:
+            with open(tmp_path, 'wb') as f:
                 pickle.dump(value, f)
+            os.replace(tmp_path, cache_path)
             return True
         except Exception as e:
             print(f"Cache write error: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
             return False
     
+    def get_versioned(self, key: str, version, ttl_hours: int = 24) -> Optional[Any]:
+        """
+        获取带版本的缓存
+        
+        条目内记录写入时的版本, 与 version 不一致时视为未命中。
+        键不随版本变化, 源数据更新后新条目覆盖旧条目, 缓存目录不会无限增长。
+        """
+        entry = self.get(key, ttl_hours=ttl_hours)
+        if not isinstance(entry, dict) or entry.get('version') != version:
+            return None
+        return entry.get('value')
+    
+    def set_versioned(self, key: str, version, value: Any) -> bool:
+        """设置带版本的缓存 (覆盖同一键的旧版本)"""
+        return self.set(key, {'version': version, 'value': value})
+    
     def delete(self, key: str) -> bool:
         """删除指定缓存"""
         cache_path = self._get_cache_path(key)
@@ -176,6 +200,16 @@ def get_data_cache() -> DataCache:
     return DataCache()
 
 
+def file_version(path) -> tuple:
+    """
+    文件版本 (修改时间, 大小), 配合 get_versioned / set_versioned 使用
+    
+    应在读取文件之前取得, 读取期间文件被改写时下次会重新读取
+    """
+    stat = Path(path).stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 if __name__ == "__main__":
     # 测试
     cache = CacheManager()
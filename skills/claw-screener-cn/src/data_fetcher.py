@@ -1,13 +1,33 @@
 """
 A股股票数据获取 - 使用 Baostock + Akshare
 """
+import sys
 import baostock as bs
 import akshare as ak
 import pandas as pd
-import json
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, Dict, List
-import requests
+
+from cache import get_cache
+
+# 与 stock-analyzer 一同安装时, 全市场实时行情快照共用其磁盘缓存 (位置和有效期由 _spot_cache 决定);
+# 本技能单独安装时退回自身的 CacheManager 缓存
+_SHARED_SPOT_CACHE_DIR = Path(__file__).resolve().parents[2] / "stock-analyzer" / "scripts"
+try:
+    if (_SHARED_SPOT_CACHE_DIR / "_spot_cache.py").exists() and str(_SHARED_SPOT_CACHE_DIR) not in sys.path:
+        sys.path.append(str(_SHARED_SPOT_CACHE_DIR))
+    from _spot_cache import get_spot
+    HAS_SHARED_SPOT_CACHE = True
+except ImportError:
+    HAS_SHARED_SPOT_CACHE = False
+
+# 单独安装时全市场实时行情快照缓存时间(小时), 与 _spot_cache 的默认有效期一致
+SPOT_CACHE_TTL_HOURS = 0.5
+
+# K线价格列 (以 float32 存储)
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
 
 class AStockDataFetcher:
     """A股数据获取器"""
@@ -19,6 +39,19 @@ class AStockDataFetcher:
         """登录Baostock"""
         self._lg = bs.login()
     
+    def _get_spot_df(self) -> pd.DataFrame:
+        """获取全市场实时行情 (同一交易日内多次调用共用一份缓存快照)"""
+        if HAS_SHARED_SPOT_CACHE:
+            return get_spot()
+        
+        cache = get_cache()
+        key = f"spot_em_{datetime.now().strftime('%Y%m%d')}"
+        df = cache.get(key, ttl_hours=SPOT_CACHE_TTL_HOURS)
+        if df is None:
+            df = ak.stock_zh_a_spot_em()
+            cache.set(key, df)
+        return df
+    
     def get_stock_list(self, market: str = "all") -> List[str]:
         """
         获取股票列表
@@ -93,8 +126,9 @@ class AStockDataFetcher:
         
         # 转换数据类型
         numeric_cols = ['open', 'high', 'low', 'close', 'volume', 'amount', 'turn', 'pctChg']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+        # 价格只有两位小数, float32 足够, 数据体积减半; 指标计算时再转 float64
+        df[PRICE_COLUMNS] = df[PRICE_COLUMNS].astype('float32')
         
         return df
     
@@ -112,8 +146,8 @@ class AStockDataFetcher:
             # 格式化代码
             code = stock_code.replace('.', '')
             
-            # 使用 Akshare 获取实时数据
-            df = ak.stock_zh_a_spot_em()
+            # 使用 Akshare 获取实时数据 (全市场快照带缓存)
+            df = self._get_spot_df()
             
             # 过滤
             row = df[df['代码'] == code]
@@ -9,6 +9,43 @@ import glob
 
 FINANCIAL_DIR = Path("/home/liujerry/金融数据/fundamentals")
 
+# 按股票代码分组的最新报告期财务数据 (进程内只加载一次)
+_LATEST_BY_CODE: Optional[Dict[str, pd.DataFrame]] = None
+
+
+def _load_latest_financials() -> Dict[str, pd.DataFrame]:
+    """
+    读取全部财务批次文件, 按股票代码分组并只保留最新报告期
+    
+    Returns:
+        {股票代码: 该股票最新报告期的全部指标行}
+    """
+    global _LATEST_BY_CODE
+    if _LATEST_BY_CODE is not None:
+        return _LATEST_BY_CODE
+    
+    pattern = str(FINANCIAL_DIR / "a_stock_financial_new_batch*.csv")
+    frames = []
+    for f in sorted(glob.glob(pattern)):
+        try:
+            frames.append(pd.read_csv(f))
+        except Exception:
+            continue
+    
+    if not frames:
+        _LATEST_BY_CODE = {}
+        return _LATEST_BY_CODE
+    
+    data = pd.concat(frames, ignore_index=True)
+    data['stock_code'] = data['stock_code'].astype(str).str.zfill(6)
+    
+    # 每只股票只保留最新报告期的行 (无需排序, 分组保持原始行顺序)
+    latest_period = data.groupby('stock_code')['report_period'].transform('max')
+    data = data[data['report_period'] == latest_period]
+    
+    _LATEST_BY_CODE = {code: group for code, group in data.groupby('stock_code', sort=False)}
+    return _LATEST_BY_CODE
+
 
 def load_financial_data(stock_code: str) -> Optional[Dict]:
     """
@@ -23,36 +60,13 @@ def load_financial_data(stock_code: str) -> Optional[Dict]:
     # 股票代码格式化为6位
     stock_code = str(stock_code).zfill(6)
     
-    # 查找该股票的所有财务文件
-    pattern = str(FINANCIAL_DIR / "a_stock_financial_new_batch*.csv")
-    files = glob.glob(pattern)
-    
-    # 读取所有文件
-    all_data = []
-    for f in files:
-        try:
-            df = pd.read_csv(f)
-            df = df[df['stock_code'].astype(str).str.zfill(6) == stock_code]
-            if not df.empty:
-                all_data.append(df)
-        except Exception as e:
-            continue
+    # 最新报告期数据 (全部文件只读取、排序一次)
+    data = _load_latest_financials().get(stock_code)
     
-    if not all_data:
+    if data is None or data.empty:
         return None
     
-    # 合并所有数据
-    data = pd.concat(all_data, ignore_index=True)
-    
-    if data.empty:
-        return None
-    
-    # 获取最新报告期
-    latest_period = data['report_period'].max()
-    data = data[data['report_period'] == latest_period]
-    
-    if data.empty:
-        return None
+    latest_period = data['report_period'].iat[0]
     
     # 提取关键指标
     result = {}
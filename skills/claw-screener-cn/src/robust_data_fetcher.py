@@ -11,9 +11,47 @@ import time
 import random
 import json
 
+from json_io import loads
+
 DATA_DIR = Path("/home/liujerry/金融数据/stocks_backup")
 FINANCIAL_DIR = Path("/home/liujerry/金融数据/fundamentals/chuangye_full")
 
+_SESSION = None
+
+# 东方财富 K线 fields2=f51..f61 的字段顺序
+EASTMONEY_KLINE_COLUMNS = [
+    'date', 'open', 'close', 'high', 'low', 'volume', 'amount',
+    'amplitude', 'pct_change', 'change', 'turnover',
+]
+
+# OHLC 价格用 float32 存储即可满足精度, 内存和文件体积减半
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+
+def _compact_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """将K线价格列转为 float32, 成交量转为整数 (有缺失值时保留浮点)"""
+    df[PRICE_COLUMNS] = df[PRICE_COLUMNS].apply(pd.to_numeric, errors='coerce').astype('float32')
+    volume = pd.to_numeric(df['volume'], errors='coerce')
+    df['volume'] = volume.astype('int64') if volume.notna().all() else volume
+    return df
+
+
+def _get_session():
+    """获取共享的 HTTP 会话 (连接池复用, 避免每次请求重新 TCP+TLS 握手)"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+        _SESSION = requests.Session()
+        _SESSION.mount('https://', adapter)
+        _SESSION.mount('http://', adapter)
+    return _SESSION
+
 
 class DataSource:
     """数据源基类"""
@@ -40,7 +78,6 @@ class SinaSource(DataSource):
     
     def get_kline(self, symbol: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
         try:
-            import requests
             url = f"https://quotes.sina.cn/cn/api/jsonp.php/var%20_{symbol}=/CN_MarketDataService.getKLineData"
             params = {
                 "symbol": f"sz{symbol}" if symbol.startswith('3') else f"sh{symbol}",
@@ -49,7 +86,7 @@ class SinaSource(DataSource):
                 "datalen": "1024"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = _get_session().get(url, params=params, timeout=10)
             if response.status_code != 200:
                 return None
             
@@ -75,10 +112,9 @@ class SinaSource(DataSource):
     
     def get_realtime(self, symbol: str) -> Optional[dict]:
         try:
-            import requests
             exchange = "sz" if symbol.startswith('3') else "sh"
             url = f"https://hq.sinajs.cn/list={exchange}{symbol}"
-            response = requests.get(url, timeout=5)
+            response = _get_session().get(url, timeout=5)
             if response.status_code != 200:
                 return None
             
@@ -108,7 +144,6 @@ class SinaSource(DataSource):
     def get_financial(self, symbol: str) -> Optional[dict]:
         # 新浪财务数据
         try:
-            import requests
             exchange = "sz" if symbol.startswith('3') else "sh"
             url = f"https://finance.sina.com.cn/realstock/company/{exchange}{symbol}/nc.shtml"
             # 简化版本，返回空
@@ -119,9 +154,8 @@ class SinaSource(DataSource):
     def get_trading(self, symbol: str) -> Optional[dict]:
         # 新浪资金流向
         try:
-            import requests
             url = f"https://money6.sina.cn/lm/zhangban/data/{symbol}.js"
-            response = requests.get(url, timeout=5)
+            response = _get_session().get(url, timeout=5)
             if response.status_code == 200:
                 text = response.text
                 # 解析资金数据
@@ -138,8 +172,6 @@ class EastMoneySource(DataSource):
     
     def get_kline(self, symbol: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
         try:
-            import requests
-            
             secid = f"1.{symbol}" if symbol.startswith('6') else f"0.{symbol}"
             url = "https://push2his.eastmoney.com/api/qt/stock/kline/get"
             params = {
@@ -153,11 +185,11 @@ class EastMoneySource(DataSource):
                 "lmt": "1000000"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = _get_session().get(url, params=params, timeout=10)
             if response.status_code != 200:
                 return None
             
-            data = response.json()
+            data = loads(response.content)
             if data.get('data') is None:
                 return None
             
@@ -165,27 +197,18 @@ class EastMoneySource(DataSource):
             if not klines:
                 return None
             
-            records = []
-            for line in klines:
-                parts = line.split(',')
-                records.append({
-                    'date': parts[0],
-                    'open': parts[1],
-                    'high': parts[2],
-                    'low': parts[3],
-                    'close': parts[4],
-                    'volume': parts[5],
-                    'amount': parts[6] if len(parts) > 6 else None,
-                })
-            
-            return pd.DataFrame(records)
+            # 一次性拆分为二维列表构造 DataFrame, 不再逐行构建字典
+            rows = [line.split(',') for line in klines]
+            width = min(len(rows[0]), len(EASTMONEY_KLINE_COLUMNS))
+            df = pd.DataFrame([r[:width] for r in rows], columns=EASTMONEY_KLINE_COLUMNS[:width])
+            if 'amount' not in df.columns:
+                df['amount'] = None
+            return df[['date', 'open', 'high', 'low', 'close', 'volume', 'amount']]
         except Exception as e:
             return None
     
     def get_realtime(self, symbol: str) -> Optional[dict]:
         try:
-            import requests
-            
             secid = f"1.{symbol}" if symbol.startswith('6') else f"0.{symbol}"
             url = "https://push2.eastmoney.com/api/qt/ulist.np/get"
             params = {
@@ -195,7 +218,7 @@ class EastMoneySource(DataSource):
                 "secids": secid
             }
             
-            response = requests.get(url, params=params, timeout=5)
+            response = _get_session().get(url, params=params, timeout=5)
             if response.status_code != 200:
                 return None
             
@@ -224,13 +247,11 @@ class EastMoneySource(DataSource):
     def get_financial(self, symbol: str) -> Optional[dict]:
         """获取财务指标"""
         try:
-            import requests
-            
             secid = f"1.{symbol}" if symbol.startswith('6') else f"0.{symbol}"
             url = "https://emweb.securities.eastmoney.com/PC_HSF10/FinancialAnalysis/MainTargetAjax"
             params = {"code": secid}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = _get_session().get(url, params=params, timeout=10)
             if response.status_code != 200:
                 return {}
             
@@ -242,8 +263,6 @@ class EastMoneySource(DataSource):
     def get_trading(self, symbol: str) -> Optional[dict]:
         """获取资金流向"""
         try:
-            import requests
-            
             secid = f"1.{symbol}" if symbol.startswith('6') else f"0.{symbol}"
             url = "https://push2.eastmoney.com/api/qt/stock/fflow/daykline/get"
             params = {
@@ -253,7 +272,7 @@ class EastMoneySource(DataSource):
                 "secid": secid
             }
             
-            response = requests.get(url, params=params, timeout=5)
+            response = _get_session().get(url, params=params, timeout=5)
             if response.status_code != 200:
                 return {}
             
@@ -285,8 +304,6 @@ class XueqiuSource(DataSource):
     
     def get_kline(self, symbol: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
         try:
-            import requests
-            
             url = "https://stock.xueqiu.com/v5/stock/chart/kline.json"
             headers = {'Cookie': 'xq_a_token=test', 'User-Agent': 'Mozilla/5.0'}
             
@@ -301,7 +318,7 @@ class XueqiuSource(DataSource):
                 "indicator": "kline"
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = _get_session().get(url, params=params, headers=headers, timeout=10)
             if response.status_code != 200:
                 return None
             
@@ -354,7 +371,7 @@ class RobustDataFetcher:
             try:
                 df = source.get_kline(symbol, start_date, end_date)
                 if df is not None and len(df) > 0:
-                    return df
+                    return _compact_ohlcv(df)
             except:
                 continue
         return None
@@ -4,16 +4,19 @@ A股股票筛选器 - 综合筛选 (技术面 + 基本面)
 结合 Williams %R 超卖信号和巴菲特公式
 """
 import sys
-import json
+import heapq
 import argparse
 from datetime import datetime
 
+import numpy as np
+
 # 添加 src 目录到路径
 sys.path.insert(0, __file__.rsplit('/', 1)[0])
 
 from data_fetcher import AStockDataFetcher
 from technical_indicators import calculate_williams_r, calculate_rsi, calculate_bollinger_bands, interpret_williams_r
 from formulas import BuffettFormula, analyze_stock_fundamental
+from json_io import dump_json, dump_ndjson
 
 
 def format_stock_code(code: str) -> str:
@@ -37,27 +40,23 @@ def analyze_stock_technical(fetcher: AStockDataFetcher, stock_code: str, name: s
         return None
     
     # 计算技术指标
-    df['williams_r'] = calculate_williams_r(
+    # 价格列以 float32 存储, 只转换一次 float64 供各指标共用
+    close = df['close'].astype(float)
+    
+    # 指标只取最新值, 直接读各序列末位, 不写回 df 也不构造整行 Series
+    wr = calculate_williams_r(
         df['high'].astype(float),
         df['low'].astype(float),
-        df['close'].astype(float),
+        close,
         period=14
-    )
+    ).iat[-1]
     
-    df['rsi'] = calculate_rsi(df['close'].astype(float), period=14)
+    rsi = calculate_rsi(close, period=14).iat[-1]
     
-    middle, upper, lower = calculate_bollinger_bands(df['close'].astype(float))
-    df['bb_middle'] = middle
-    df['bb_upper'] = upper
-    df['bb_lower'] = lower
+    _, _, lower = calculate_bollinger_bands(close)
+    bb_lower = lower.iat[-1]
     
-    # 获取最新数据
-    latest = df.iloc[-1]
-    
-    price = latest['close']
-    wr = latest['williams_r']
-    rsi = latest['rsi']
-    bb_lower = latest['bb_lower']
+    price = float(df['close'].iat[-1])
     
     # 判断信号
     signal = "观望"
@@ -184,35 +183,12 @@ def run_screening(stock_list: list, min_score: int = 5, top_n: int = 10,
             if technical is None and fundamental is None:
                 continue
             
-            # 综合评分
-            total_score = 0
-            signals = []
-            
-            if technical:
-                if technical['williams_r'] and technical['williams_r'] <= -80:
-                    total_score += 3
-                    signals.append("超卖")
-                elif technical['williams_r'] and technical['williams_r'] <= -70:
-                    total_score += 1
-                    signals.append("接近超卖")
-            
-            if fundamental:
-                total_score += fundamental.get('fundamental_score', 0)
-            
-            # 判断是否通过筛选
-            passed = total_score >= min_score
-            
-            result = {
+            results.append({
                 'code': code,
                 'name': name,
                 'technical': technical,
                 'fundamental': fundamental,
-                'total_score': total_score,
-                'signals': signals,
-                'passed': passed
-            }
-            
-            results.append(result)
+            })
             
         except Exception as e:
             print(f"  处理 {code} 时出错: {e}")
@@ -220,10 +196,50 @@ def run_screening(stock_list: list, min_score: int = 5, top_n: int = 10,
     
     fetcher.close()
     
-    # 按分数排序
-    results.sort(key=lambda x: x['total_score'], reverse=True)
+    score_results(results, min_score)
+    return select_top(results, top_n)
+
+
+# Williams %R 阈值 -> (加分, 信号) (从低到高匹配)
+WR_SIGNAL_LEVELS = [
+    (-80, 3, "超卖"),
+    (-70, 1, "接近超卖"),
+]
+
+
+def score_results(results: list, min_score: int):
+    """
+    批量计算综合评分 (技术面 WR 加分 + 基本面分数), 原地写入
+    total_score / signals / passed
+    """
+    if not results:
+        return
     
-    return results[:top_n]
+    wr = np.array([
+        r['technical']['williams_r'] if r['technical'] and r['technical']['williams_r'] is not None else np.nan
+        for r in results
+    ], dtype=float)
+    fundamental_scores = np.array([
+        r['fundamental'].get('fundamental_score', 0) if r['fundamental'] else 0
+        for r in results
+    ])
+    
+    # NaN 与任何阈值比较均为 False, 缺失的 WR 不加分
+    conditions = [wr <= threshold for threshold, _, _ in WR_SIGNAL_LEVELS]
+    tech_scores = np.select(conditions, [points for _, points, _ in WR_SIGNAL_LEVELS], default=0)
+    labels = np.select(conditions, [label for _, _, label in WR_SIGNAL_LEVELS], default='')
+    total_scores = tech_scores + fundamental_scores
+    passed = total_scores >= min_score
+    
+    for r, total, label, ok in zip(results, total_scores.tolist(), labels.tolist(), passed.tolist()):
+        r['total_score'] = total
+        r['signals'] = [label] if label else []
+        r['passed'] = ok
+
+
+def select_top(results: list, top_n: int) -> list:
+    """按总分取前N只 (同分保持原顺序)"""
+    return heapq.nlargest(top_n, results, key=lambda r: r['total_score'])
 
 
 def main():
@@ -234,7 +250,7 @@ def main():
     parser.add_argument('--top-n', type=int, default=10, help='返回前N只')
     parser.add_argument('--no-technical', action='store_true', help='不使用技术面筛选')
     parser.add_argument('--no-fundamental', action='store_true', help='不使用基本面筛选')
-    parser.add_argument('--output', type=str, help='输出文件路径')
+    parser.add_argument('--output', type=str, help='输出文件路径 (.ndjson/.jsonl 后缀则每行一条结果)')
     
     args = parser.parse_args()
     
@@ -298,8 +314,10 @@ def main():
     
     # 保存到文件
     if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        if args.output.endswith(('.ndjson', '.jsonl')):
+            dump_ndjson(results, args.output)
+        else:
+            dump_json(results, args.output)
         print(f"\n结果已保存到: {args.output}")
 
 
@@ -4,7 +4,9 @@ A股股票筛选器 - 完整版 (技术面 + 基本面 + DCF估值)
 使用本地真实财务数据 - 修复数据单位
 """
 import sys
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -29,6 +31,25 @@ WATCHLIST = [
 DATA_DIR = Path("/home/liujerry/金融数据/stocks_clean")
 BACKUP_DATA_DIR = Path("/home/liujerry/金融数据/stocks_backup")
 FINANCIAL_DIR = Path("/home/liujerry/金融数据/fundamentals/chuangye_full")
+MAX_WORKERS = 8
+LATEST_DATE_CACHE_TTL_HOURS = 24 * 30
+
+
+def _latest_date(path: Path):
+    """
+    行情文件的最新日期
+    
+    只解析 date 列, 结果按路径缓存到磁盘 (条目内记录文件 (mtime, size) 版本), 文件未变化时不再读取CSV
+    """
+    key = f"kline_latest_date:{path}"
+    version = file_version(path)
+    cache = get_cache()
+    latest = cache.get_versioned(key, version, ttl_hours=LATEST_DATE_CACHE_TTL_HOURS)
+    if latest is None:
+        dates = pd.read_csv(path, usecols=['date'])['date']
+        latest = pd.to_datetime(dates.max())
+        cache.set_versioned(key, version, latest)
+    return latest
 
 
 def get_stock_data_path(code: str) -> Path:
@@ -38,17 +59,10 @@ def get_stock_data_path(code: str) -> Path:
     
     # 检查哪个数据更新
     if primary.exists() and backup.exists():
-        # 读取两个文件的最新日期
+        # 比较两个文件的最新日期, 主数据更新时才用主数据 (读取失败时仍用备份)
         try:
-            df_primary = pd.read_csv(primary)
-            df_backup = pd.read_csv(backup)
-            
-            if 'date' in df_primary.columns and 'date' in df_backup.columns:
-                primary_date = pd.to_datetime(df_primary['date'].max())
-                backup_date = pd.to_datetime(df_backup['date'].max())
-                
-                if backup_date > primary_date:
-                    return backup
+            if _latest_date(primary) > _latest_date(backup):
+                return primary
         except:
             pass
     
@@ -60,9 +74,41 @@ def get_stock_data_path(code: str) -> Path:
 
 sys.path.insert(0, __file__.rsplit('/', 1)[0])
 
-from cache import get_data_cache
+from cache import get_cache, file_version
+from screening_local import load_kline, latest_williams_r, HAS_PARQUET
 from advanced_analysis import CarlsonQualityScore
 from formulas import FormulaEngine, FinancialData, FormulaStatus
+# numba 为可选加速, 默认关闭, 开关见 technical_indicators
+from technical_indicators import HAS_NUMBA
+
+
+# profit.csv 解析结果 (按 (路径, 文件版本) 索引)
+_PROFIT_TABLES = {}
+PROFIT_CACHE_TTL_HOURS = 24 * 30
+
+
+def _load_profit_table(profit_file: Path) -> dict:
+    """
+    读取 profit.csv 为 {code: 行字典}
+    
+    缓存在进程内和磁盘上 (磁盘条目按路径存放, 内含文件 (mtime, size) 版本), 文件未变化时跳过CSV解析
+    """
+    key = f"profit_table:{profit_file}"
+    version = file_version(profit_file)
+    table = _PROFIT_TABLES.get((key, version))
+    if table is not None:
+        return table
+    
+    cache = get_cache()
+    table = cache.get_versioned(key, version, ttl_hours=PROFIT_CACHE_TTL_HOURS)
+    if table is None:
+        df = pd.read_csv(profit_file)
+        # 同一代码保留首行, 与逐次筛选时取 iloc[0] 一致
+        table = df.drop_duplicates('code').set_index('code').to_dict('index')
+        cache.set_versioned(key, version, table)
+    
+    _PROFIT_TABLES[(key, version)] = table
+    return table
 
 
 def load_financial_data(stock_code: str) -> dict:
@@ -79,10 +125,8 @@ def load_financial_data(stock_code: str) -> dict:
     profit_file = FINANCIAL_DIR / "profit.csv"
     if profit_file.exists():
         try:
-            df = pd.read_csv(profit_file)
-            row = df[df['code'] == code_with_exchange]
-            if not row.empty:
-                row = row.iloc[0]
+            row = _load_profit_table(profit_file).get(code_with_exchange)
+            if row is not None:
                 # ROE: 小数 -> 百分比
                 if 'roeAvg' in row and pd.notna(row['roeAvg']):
                     result['roe'] = float(row['roeAvg']) * 100
@@ -116,9 +160,10 @@ def load_financial_data(stock_code: str) -> dict:
     return result
 
 
-def get_buffett_format(stock_code: str) -> dict:
-    """获取巴菲特公式格式"""
-    data = load_financial_data(stock_code)
+def get_buffett_format(stock_code: str, data: dict = None) -> dict:
+    """获取巴菲特公式格式 (data 为已加载的财务数据时直接复用)"""
+    if data is None:
+        data = load_financial_data(stock_code)
     
     if not data:
         return {}
@@ -241,15 +286,6 @@ def calculate_dcf(financial_data: dict, price: float) -> dict:
     }
 
 
-def calculate_williams_r(high, low, close, period=14):
-    highest_high = high.rolling(window=period).max()
-    lowest_low = low.rolling(window=period).min()
-    diff = highest_high - lowest_low
-    diff = diff.replace(0, pd.NA)
-    wr = ((highest_high - close) / diff) * -100
-    return wr
-
-
 def calculate_rsi(prices, period=14):
     delta = prices.diff()
     gain = delta.where(delta > 0, 0).rolling(window=period).mean()
@@ -276,6 +312,183 @@ def calculate_macd(prices, fast=12, slow=26, signal=9):
     return dif, dea, macd
 
 
+# 最新指标的固定参数; numba 把模块级常量当作编译期常量, 内核按这些周期特化
+RSI_PERIOD = 14
+BB_PERIOD = 20
+BB_STD = 2.0
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+
+
+if HAS_NUMBA:
+    from numba import njit
+    
+    @njit(cache=True, error_model='numpy')
+    def _latest_indicators_kernel(close):
+        """
+        计算最新一日的 RSI、布林下轨、MACD 的 DIF/DEA
+        
+        与 calculate_rsi / calculate_bollinger_bands / calculate_macd 的末值一致,
+        要求 close 不含 NaN
+        """
+        rsi_period = RSI_PERIOD
+        bb_period = BB_PERIOD
+        std_dev = BB_STD
+        fast = MACD_FAST
+        slow = MACD_SLOW
+        signal = MACD_SIGNAL
+        n = len(close)
+        
+        rsi = np.nan
+        if n >= rsi_period:
+            gain = 0.0
+            loss = 0.0
+            for i in range(max(n - rsi_period, 1), n):
+                delta = close[i] - close[i - 1]
+                if delta > 0:
+                    gain += delta
+                elif delta < 0:
+                    loss -= delta
+            rsi = 100 - 100 / (1 + gain / loss)
+        
+        bb_lower = np.nan
+        if n >= bb_period:
+            total = 0.0
+            for i in range(n - bb_period, n):
+                total += close[i]
+            middle = total / bb_period
+            sq = 0.0
+            for i in range(n - bb_period, n):
+                sq += (close[i] - middle) ** 2
+            bb_lower = middle - std_dev * np.sqrt(sq / (bb_period - 1))
+        
+        a_fast = 2.0 / (fast + 1)
+        a_slow = 2.0 / (slow + 1)
+        a_signal = 2.0 / (signal + 1)
+        ema_fast = close[0]
+        ema_slow = close[0]
+        dea = 0.0
+        for i in range(1, n):
+            ema_fast = a_fast * close[i] + (1.0 - a_fast) * ema_fast
+            ema_slow = a_slow * close[i] + (1.0 - a_slow) * ema_slow
+            dea = a_signal * (ema_fast - ema_slow) + (1.0 - a_signal) * dea
+        
+        return rsi, bb_lower, ema_fast - ema_slow, dea
+
+
+def calculate_latest_indicators(close):
+    """
+    最新一日的技术指标
+    
+    Returns:
+        (RSI, 布林下轨, MACD DIF, MACD DEA)
+    """
+    values = close.to_numpy(dtype=np.float64)
+    if HAS_NUMBA and len(values) > 0 and np.isfinite(values).all():
+        return _latest_indicators_kernel(values)
+    
+    rsi = calculate_rsi(close, RSI_PERIOD)
+    _, _, bb_lower = calculate_bollinger_bands(close, BB_PERIOD, BB_STD)
+    dif, dea, _ = calculate_macd(close, MACD_FAST, MACD_SLOW, MACD_SIGNAL)
+    return rsi.iloc[-1], bb_lower.iloc[-1], dif.iloc[-1], dea.iloc[-1]
+
+
+KLINE_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def load_recent_kline(file_path: Path, days: int = 90):
+    """
+    读取按日期排序后的最近 days 天行情
+    
+    有 pyarrow 时与 screening_local 共用清洗后的 Parquet 缓存,
+    CSV 未更新时不再解析文本、转换日期和排序
+    
+    Returns:
+        DataFrame (缺少必要列时返回 None)
+    """
+    if HAS_PARQUET:
+        return load_kline(file_path, days)
+    
+    numeric_cols = KLINE_COLUMNS[1:]
+    
+    # 只解析需要的列 (amount/turn 等其余列不读入)
+    df = pd.read_csv(file_path, usecols=lambda col: col in KLINE_COLUMNS)
+    if not all(col in df.columns for col in KLINE_COLUMNS):
+        return None
+    
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values('date')
+    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+    return df.tail(days)
+
+
+# 总分阈值 -> 投资建议 (从高到低匹配)
+RECOMMENDATION_LEVELS = [
+    (6, "🚀 强烈推荐"),
+    (4, "⭐ 建议关注"),
+    (2, "👀 观察"),
+]
+DEFAULT_RECOMMENDATION = "➡️ 观望"
+
+
+def recommend(total_scores) -> np.ndarray:
+    """按总分批量生成投资建议"""
+    scores = np.asarray(total_scores)
+    return np.select(
+        [scores >= threshold for threshold, _ in RECOMMENDATION_LEVELS],
+        [label for _, label in RECOMMENDATION_LEVELS],
+        default=DEFAULT_RECOMMENDATION,
+    )
+
+
+# 行情指标快照 (按 (路径, 文件版本) 索引); 键前缀带版本号, 指标算法变化时递增使旧缓存失效
+_KLINE_SNAPSHOTS = {}
+KLINE_SNAPSHOT_KEY = "kline_snapshot_v1"
+KLINE_SNAPSHOT_TTL_HOURS = 24 * 30
+
+
+def _kline_snapshot(file_path: Path):
+    """
+    行情文件的最新价格和技术指标
+    
+    缓存在进程内和磁盘上 (磁盘条目按路径存放, 内含文件 (mtime, size) 版本), 行情未更新时跳过CSV读取和指标计算
+    
+    Returns:
+        {'days', 'price', 'wr', 'rsi', 'bb_lower', 'macd_dif', 'macd_dea'},
+        数据不足30天时只有 'days'; 数据格式错误时返回 None
+    """
+    key = f"{KLINE_SNAPSHOT_KEY}:{file_path}"
+    version = file_version(file_path)
+    snapshot = _KLINE_SNAPSHOTS.get((key, version))
+    if snapshot is not None:
+        return snapshot
+    
+    cache = get_cache()
+    snapshot = cache.get_versioned(key, version, ttl_hours=KLINE_SNAPSHOT_TTL_HOURS)
+    if snapshot is None:
+        df = load_recent_kline(file_path)
+        if df is None:
+            return None
+        
+        snapshot = {'days': len(df)}
+        if len(df) >= 30:
+            close = df['close']
+            rsi_val, bb_lower, macd_dif, macd_dea = calculate_latest_indicators(close)
+            snapshot.update({
+                'price': close.iloc[-1],
+                'wr': latest_williams_r(df['high'], df['low'], close),
+                'rsi': rsi_val,
+                'bb_lower': bb_lower,
+                'macd_dif': macd_dif,
+                'macd_dea': macd_dea,
+            })
+        cache.set_versioned(key, version, snapshot)
+    
+    _KLINE_SNAPSHOTS[(key, version)] = snapshot
+    return snapshot
+
+
 def analyze_stock(code, name):
     file_path = get_stock_data_path(code)
     
@@ -283,37 +496,21 @@ def analyze_stock(code, name):
         return {'code': code, 'name': name, 'error': '行情数据不存在'}
     
     try:
-        df = pd.read_csv(file_path)
-        
-        required_cols = ['date', 'open', 'high', 'low', 'close', 'volume']
-        if not all(col in df.columns for col in required_cols):
+        snapshot = _kline_snapshot(file_path)
+        if snapshot is None:
             return {'code': code, 'name': name, 'error': '数据格式错误'}
         
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date')
-        
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        df = df.tail(90)
-        
-        if len(df) < 30:
-            return {'code': code, 'name': name, 'error': f'数据不足{len(df)}天'}
+        if snapshot['days'] < 30:
+            return {'code': code, 'name': name, 'error': f"数据不足{snapshot['days']}天"}
         
         # 技术指标
-        df['williams_r'] = calculate_williams_r(df['high'], df['low'], df['close'])
-        df['rsi'] = calculate_rsi(df['close'])
-        df['bb_middle'], df['bb_upper'], df['bb_lower'] = calculate_bollinger_bands(df['close'])
-        df['macd_dif'], df['macd_dea'], df['macd'] = calculate_macd(df['close'])
-        
-        latest = df.iloc[-1]
+        wr = snapshot['wr']
+        rsi_val = snapshot['rsi']
+        bb_lower = snapshot['bb_lower']
+        macd_dif = snapshot['macd_dif']
+        macd_dea = snapshot['macd_dea']
         
-        price = latest['close']
-        wr = latest['williams_r']
-        rsi_val = latest['rsi']
-        bb_lower = latest['bb_lower']
-        macd_dif = latest['macd_dif']
-        macd_dea = latest['macd_dea']
+        price = snapshot['price']
         
         # 技术信号
         tech_signals = []
@@ -350,7 +547,7 @@ def analyze_stock(code, name):
         financial_data = load_financial_data(code)
         
         # 巴菲特公式
-        buffett_data = get_buffett_format(code)
+        buffett_data = get_buffett_format(code, financial_data)
         buffett_result = None
         if buffett_data:
             try:
@@ -363,7 +560,7 @@ def analyze_stock(code, name):
         # Carlson
         carlson = CarlsonQualityScore(financial_data, {'price': price})
         carlson_score = carlson.compute_total_score()
-        carlson_rating = carlson.get_rating()
+        carlson_rating = carlson.get_rating(carlson_score)
         
         # DCF
         dcf_result = calculate_dcf(financial_data, price)
@@ -371,15 +568,6 @@ def analyze_stock(code, name):
         # 总分
         total_score = tech_score + (carlson_score // 10)
         
-        if total_score >= 6:
-            recommendation = "🚀 强烈推荐"
-        elif total_score >= 4:
-            recommendation = "⭐ 建议关注"
-        elif total_score >= 2:
-            recommendation = "👀 观察"
-        else:
-            recommendation = "➡️ 观望"
-        
         return {
             'code': code, 'name': name, 'price': round(price, 2) if pd.notna(price) else None,
             'williams_r': round(wr, 2) if pd.notna(wr) else None,
@@ -393,38 +581,66 @@ def analyze_stock(code, name):
             'carlson_rating': carlson_rating,
             'dcf': dcf_result,
             'total_score': total_score,
-            'recommendation': recommendation,
         }
     except Exception as e:
         return {'code': code, 'name': name, 'error': str(e)}
 
 
+def _analyze_item(item):
+    """线程池任务: 加载财务数据并分析单只股票"""
+    code, name = item
+    return load_financial_data(code), analyze_stock(code, name)
+
+
 def main():
     print("=" * 90)
     print("📊 A股自选股综合分析报告 (真实财务 + 技术面 + 巴菲特公式 + DCF估值)")
     print(f"   {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print("=" * 90)
     
+    # 各股票相互独立, 并行分析 (map 保持自选股顺序, 进度仍按顺序打印)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        outcomes = list(executor.map(_analyze_item, WATCHLIST))
+    
     results = []
     
-    for code, name in WATCHLIST:
+    for (code, name), (financial_data, result) in zip(WATCHLIST, outcomes):
         print(f"\n分析 {code} {name}...")
-        financial_data = load_financial_data(code)
         if financial_data:
             print(f"  ✅ ROE={financial_data.get('roe', 0):.1f}% 净利润={financial_data.get('net_profit', 0):.1f}亿")
-        result = analyze_stock(code, name)
         results.append(result)
     
-    # 排序
-    results_with_score = [r for r in results if 'total_score' in r]
-    results_with_score.sort(key=lambda x: x['total_score'], reverse=True)
+    # 有评分的结果先汇总成列式表格 (每个字段一列), 排序和输出都基于该表
+    scored = [r for r in results if 'total_score' in r]
+    table = pd.DataFrame({
+        '代码': [r['code'] for r in scored],
+        '名称': [r['name'] for r in scored],
+        '价格': [r['price'] for r in scored],
+        'WR': [r['williams_r'] for r in scored],
+        'RSI': [r['rsi'] for r in scored],
+        'MACD': [r['macd'] for r in scored],
+        '技术': [r['tech_score'] for r in scored],
+        '巴菲': [sum(1 for _, s, _ in r.get('buffett_result', []) if s == 'PASS') for r in scored],
+        'Carlson': [r['carlson_score'] for r in scored],
+        'DCF上涨': [r.get('dcf', {}).get('upside_percent') for r in scored],
+        '总分': [r['total_score'] for r in scored],
+    })
+    
+    # 投资建议按总分一次性判定
+    for r, recommendation in zip(scored, recommend(table['总分'].to_numpy())):
+        r['recommendation'] = str(recommendation)
+    
+    # 排序 (总分降序, 同分保持自选股顺序)
+    order = np.argsort(-table['总分'].to_numpy(), kind='stable')
+    table = table.iloc[order]
     
     # 输出
     print("\n" + "=" * 90)
     print("📈 符合买入条件 (总分 >= 4)")
     print("=" * 90)
     
-    for r in results_with_score:
+    for i, passed in zip(order, table['巴菲']):
+        r = scored[i]
         if r['total_score'] < 4:
             continue
         dcf = r.get('dcf', {})
@@ -433,9 +649,6 @@ def main():
         print(f"\n{r['code']} {r['name']}")
         print(f"   价格: {r['price']} | WR: {r['williams_r']} | RSI: {r['rsi']} | MACD: {r['macd']}")
         print(f"   技术: {r['tech_score']}/6 | Carlson: {r['carlson_score']} ({r['carlson_rating']})")
-        
-        buffett = r.get('buffett_result', [])
-        passed = sum(1 for _, s, _ in buffett if s == 'PASS')
         print(f"   巴菲特: {passed}/10")
         
         if fin:
@@ -450,17 +663,17 @@ def main():
     print("\n" + "=" * 90)
     print("📊 全部股票状态")
     print("=" * 90)
-    print(f"{'代码':8} {'名称':8} {'价格':>7} {'WR':>7} {'RSI':>5} {'MACD':>4} {'技术':>4} {'巴菲':>4} {'Carlson':>7} {'DCF上涨':>8} {'总分'}")
-    print("-" * 90)
     
-    for r in results_with_score:
-        buffett = r.get('buffett_result', [])
-        passed = sum(1 for _, s, _ in buffett if s == 'PASS')
-        dcf = r.get('dcf', {})
-        upside = dcf.get('upside_percent', 'N/A')
-        upside_str = f"{upside:>7.1f}%" if upside not in [None, 'N/A'] else "     N/A"
+    if not table.empty:
+        def fmt(spec, suffix=''):
+            return lambda v: 'N/A' if pd.isna(v) else f"{v:{spec}}{suffix}"
         
-        print(f"{r['code']:8} {r['name']:8} {r['price']:>7.2f} {r['williams_r']:>7.1f} {r['rsi']:>5.1f} {r['macd']:>4} {r['tech_score']:>4} {passed:>4} {r['carlson_score']:>7} {upside_str} {r['total_score']}")
+        print(table.to_string(index=False, na_rep='N/A', formatters={
+            '价格': fmt('.2f'),
+            'WR': fmt('.1f'),
+            'RSI': fmt('.1f'),
+            'DCF上涨': fmt('.1f', '%'),
+        }))
     
     print("=" * 90)
     return results
@@ -3,12 +3,29 @@
 A股股票筛选器 - 使用本地数据
 分析用户13只自选股
 """
+import os
 import sys
 import json
+import threading
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from cache import file_version
+from technical_indicators import calculate_rsi, calculate_bollinger_bands
+
+# pyarrow CSV 解析器在 C++ 中释放 GIL, 多线程读取时可并行解析; 同时用于 Parquet 缓存
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    CSV_ENGINE = 'pyarrow'
+    HAS_PARQUET = True
+except ImportError:
+    CSV_ENGINE = 'c'
+    HAS_PARQUET = False
+
 # 自选股列表
 WATCHLIST = [
     ('300276', '三丰智能'),
@@ -27,35 +44,111 @@ WATCHLIST = [
 ]
 
 DATA_DIR = Path("/home/liujerry/金融数据/stocks_clean")
+# 清洗后行情的 Parquet 缓存 (CSV 更新后自动失效)
+KLINE_CACHE_DIR = Path("/tmp/claw_kline_cache")
+# 缓存文件的行组大小, 只读最近几十天时按行组跳过更早的历史
+KLINE_ROW_GROUP_SIZE = 128
+# Parquet 元数据中记录源CSV的版本 (mtime_ns, size), 与当前CSV完全一致时缓存才有效
+KLINE_SOURCE_VERSION_KEY = b'claw_source_version'
+MAX_WORKERS = 8
 
 
-def calculate_williams_r(high, low, close, period=14):
-    """计算 Williams %R"""
-    highest_high = high.rolling(window=period).max()
-    lowest_low = low.rolling(window=period).min()
+def latest_williams_r(high, low, close, period=14):
+    """
+    计算最新一日的 Williams %R (只扫描最后 period 根K线)
+    
+    与 technical_indicators.calculate_williams_r 不同, 只返回末值 (标量), 数据不足时为 NaN
+    """
+    if len(close) < period:
+        return np.nan
+    highest_high = high.to_numpy(dtype=np.float64)[-period:].max()
+    lowest_low = low.to_numpy(dtype=np.float64)[-period:].min()
     diff = highest_high - lowest_low
-    diff = diff.replace(0, pd.NA)
-    wr = ((highest_high - close) / diff) * -100
-    return wr
+    if not diff:
+        return np.nan
+    return (highest_high - float(close.iloc[-1])) / diff * -100
 
 
-def calculate_rsi(prices, period=14):
-    """计算 RSI"""
-    delta = prices.diff()
-    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+REQUIRED_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _read_parquet_tail(pf, days: int = None):
+    """读取 Parquet 缓存, 指定 days 时只读覆盖最后 days 行的行组"""
+    if days is None:
+        return pf.read().to_pandas()
+    
+    groups = []
+    rows = 0
+    for i in range(pf.num_row_groups - 1, -1, -1):
+        groups.append(i)
+        rows += pf.metadata.row_group(i).num_rows
+        if rows >= days:
+            break
+    df = pf.read_row_groups(groups[::-1]).to_pandas()
+    return df.tail(days).reset_index(drop=True)
 
 
-def calculate_bollinger_bands(prices, period=20, std_dev=2.0):
-    """计算布林带"""
-    middle = prices.rolling(window=period).mean()
-    std = prices.rolling(window=period).std()
-    upper = middle + (std * std_dev)
-    lower = middle - (std * std_dev)
-    return middle, upper, lower
+def load_kline(file_path: Path, days: int = None):
+    """
+    读取按日期排序、数值已转换的行情数据
+    
+    清洗结果以 Parquet 缓存, 缓存中记录的CSV版本 (mtime_ns, size) 与当前文件一致时直接读取,
+    跳过文本解析、日期转换和排序。按修改时间先后判断不可靠 (cp -p / rsync 会保留较旧的 mtime)。
+    
+    Args:
+        file_path: 行情CSV路径
+        days: 只返回最近 days 天 (None 为全部)
+    
+    Returns:
+        DataFrame (缺少必要列时返回 None)
+    """
+    # 文件名带上所在目录, 主数据与备份数据的同名文件各自缓存
+    cache_path = KLINE_CACHE_DIR / f"{file_path.parent.name}_{file_path.stem}.parquet"
+    version = None
+    if HAS_PARQUET:
+        try:
+            # 在读取CSV之前取版本, 读取期间文件被改写时下次会重新解析
+            mtime_ns, size = file_version(file_path)
+            version = f"{mtime_ns}:{size}".encode()
+            pf = pq.ParquetFile(cache_path)
+            if (pf.schema_arrow.metadata or {}).get(KLINE_SOURCE_VERSION_KEY) == version:
+                return _read_parquet_tail(pf, days)
+        except (OSError, ValueError):
+            # 缓存不存在或已损坏 (ArrowInvalid 为 ValueError 子类)
+            pass
+    
+    df = pd.read_csv(file_path, engine=CSV_ENGINE)
+    
+    # 确保有必要的列
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        return None
+    
+    # 由转换后的日期/数值列直接构建新表, 不再整表 copy 后逐列回写
+    numeric_cols = REQUIRED_COLUMNS[1:]
+    df = pd.DataFrame({
+        'date': pd.to_datetime(df['date']),
+        **{col: pd.to_numeric(df[col], errors='coerce') for col in numeric_cols},
+    })
+    df = df.sort_values('date').reset_index(drop=True)
+    
+    if version is not None:
+        # 临时文件名带进程号和线程号, screening_local 与 screening_full 并发写同一缓存时互不覆盖
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            KLINE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), KLINE_SOURCE_VERSION_KEY: version})
+            pq.write_table(table, tmp_path, row_group_size=KLINE_ROW_GROUP_SIZE)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
+    if days is not None:
+        df = df.tail(days).reset_index(drop=True)
+    return df
 
 
 def analyze_stock(code, name):
@@ -70,28 +163,15 @@ def analyze_stock(code, name):
         }
     
     try:
-        df = pd.read_csv(file_path)
-        
-        # 确保有必要的列
-        required_cols = ['date', 'open', 'high', 'low', 'close', 'volume']
-        if not all(col in df.columns for col in required_cols):
+        # 只取最近90天数据
+        df = load_kline(file_path, days=90)
+        if df is None:
             return {
                 'code': code,
                 'name': name,
                 'error': '数据格式错误'
             }
         
-        # 转换日期
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date')
-        
-        # 转换数值
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # 只取最近90天数据
-        df = df.tail(90)
-        
         if len(df) < 30:
             return {
                 'code': code,
@@ -99,18 +179,15 @@ def analyze_stock(code, name):
                 'error': f'数据不足，仅{len(df)}天'
             }
         
-        # 计算技术指标
-        df['williams_r'] = calculate_williams_r(df['high'], df['low'], df['close'])
-        df['rsi'] = calculate_rsi(df['close'])
-        df['bb_middle'], df['bb_upper'], df['bb_lower'] = calculate_bollinger_bands(df['close'])
+        # 计算技术指标 (收盘价列只取一次, 各指标只读取末值, 不回写 DataFrame)
+        close = df['close']
+        wr = latest_williams_r(df['high'], df['low'], close)
+        rsi_val = calculate_rsi(close).iat[-1]
+        _, _, bb_lower_series = calculate_bollinger_bands(close)
         
         # 获取最新数据
-        latest = df.iloc[-1]
-        
-        price = latest['close']
-        wr = latest['williams_r']
-        rsi_val = latest['rsi']
-        bb_lower = latest['bb_lower']
+        price = close.iat[-1]
+        bb_lower = bb_lower_series.iat[-1]
         
         # 判断信号
         signals = []
@@ -179,11 +256,9 @@ def main():
     print(f"   分析日期: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     print("=" * 70)
     
-    results = []
-    
-    for code, name in WATCHLIST:
-        result = analyze_stock(code, name)
-        results.append(result)
+    # 各股票文件相互独立, 并行读取和计算 (map 保持自选股顺序)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(lambda item: analyze_stock(*item), WATCHLIST))
     
     # 按分数排序
     results_with_score = [r for r in results if 'score' in r]
@@ -1,10 +1,120 @@
 """
 技术指标计算模块
 """
+import os
+
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Tuple, Optional
 
+# bottleneck 的滑动窗口函数为 C 实现的单遍算法 (最值用单调队列), 未安装时退回 numpy/pandas
+try:
+    import bottleneck as bn
+    HAS_BOTTLENECK = True
+except ImportError:
+    HAS_BOTTLENECK = False
+
+# numba 可将 MACD 的三条 EMA 递推与 KDJ 的平滑递推编译为单次循环。导入 numba 和加载编译缓存的
+# 固定开销在自选股规模 (十几只、每只约90行) 下抵消了收益, 因此默认走 pandas,
+# 设置环境变量 CLAW_USE_NUMBA=1 且已安装 numba 时才启用 (screening_full 同样遵循此开关)
+HAS_NUMBA = False
+if os.environ.get('CLAW_USE_NUMBA') == '1':
+    try:
+        from numba import njit
+        HAS_NUMBA = True
+    except ImportError:
+        pass
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _macd_kernel(close, fast, slow, signal):
+        """
+        单次遍历计算 DIF/DEA (等价于 ewm(span, adjust=False) 的递推)
+        
+        要求 close 不含 NaN, 首值作为快慢线初值, DEA 初值为 0
+        """
+        n = len(close)
+        dif = np.empty(n)
+        dea = np.empty(n)
+        a_fast = 2.0 / (fast + 1)
+        a_slow = 2.0 / (slow + 1)
+        a_signal = 2.0 / (signal + 1)
+        if n == 0:
+            return dif, dea
+        ema_fast = close[0]
+        ema_slow = close[0]
+        dif[0] = 0.0
+        dea[0] = 0.0
+        for i in range(1, n):
+            ema_fast = a_fast * close[i] + (1.0 - a_fast) * ema_fast
+            ema_slow = a_slow * close[i] + (1.0 - a_slow) * ema_slow
+            dif[i] = ema_fast - ema_slow
+            dea[i] = a_signal * dif[i] + (1.0 - a_signal) * dea[i - 1]
+        return dif, dea
+    
+    @njit(cache=True)
+    def _kdj_kernel(rsv, com):
+        """
+        单次遍历计算 K/D/J (K、D 等价于 ewm(com, adjust=False) 的递推)
+        
+        要求 rsv 不含 NaN/inf, 首值作为 K、D 初值
+        """
+        n = len(rsv)
+        k = np.empty(n)
+        d = np.empty(n)
+        j = np.empty(n)
+        alpha = 1.0 / (1.0 + com)
+        for i in range(n):
+            if i == 0:
+                k[i] = rsv[0]
+                d[i] = rsv[0]
+            else:
+                k[i] = alpha * rsv[i] + (1.0 - alpha) * k[i - 1]
+                d[i] = alpha * k[i] + (1.0 - alpha) * d[i - 1]
+            j[i] = 3.0 * k[i] - 2.0 * d[i]
+        return k, d, j
+
+
+def _sliding_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    滑动窗口均值 (等价于 rolling(window).mean(), 前 window-1 个值为 NaN)
+    
+    优先用 bottleneck 单遍计算, 否则在 numpy 数组的跨步视图上归约, 均不创建 pandas Rolling 对象
+    """
+    if HAS_BOTTLENECK and len(values) >= window:
+        return bn.move_mean(values, window)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return out
+
+
+def _rolling_min(series: pd.Series, window: int) -> pd.Series:
+    """滑动窗口最小值 (等价于 rolling(window).min())"""
+    if HAS_BOTTLENECK and len(series) >= window:
+        values = series.to_numpy(dtype=np.float64)
+        return pd.Series(bn.move_min(values, window), index=series.index)
+    return series.rolling(window=window).min()
+
+
+def _rolling_max(series: pd.Series, window: int) -> pd.Series:
+    """滑动窗口最大值 (等价于 rolling(window).max())"""
+    if HAS_BOTTLENECK and len(series) >= window:
+        values = series.to_numpy(dtype=np.float64)
+        return pd.Series(bn.move_max(values, window), index=series.index)
+    return series.rolling(window=window).max()
+
+
+def _sliding_std(values: np.ndarray, window: int) -> np.ndarray:
+    """滑动窗口样本标准差 (等价于 rolling(window).std(), ddof=1)"""
+    if HAS_BOTTLENECK and len(values) >= window:
+        return bn.move_std(values, window, ddof=1)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=1)
+    return out
+
 
 def calculate_williams_r(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
     """
@@ -21,8 +131,8 @@ def calculate_williams_r(high: pd.Series, low: pd.Series, close: pd.Series, peri
     Returns:
         Williams %R 值序列
     """
-    highest_high = high.rolling(window=period).max()
-    lowest_low = low.rolling(window=period).min()
+    highest_high = _rolling_max(high, period)
+    lowest_low = _rolling_min(low, period)
     
     diff = highest_high - lowest_low
     diff = diff.replace(0, np.nan)  # 避免除零
@@ -46,15 +156,17 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
     Returns:
         RSI 值序列
     """
-    delta = prices.diff()
+    close = prices.to_numpy(dtype=np.float64)
+    delta = np.diff(close, prepend=np.nan)
     
-    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    # 与 delta.where(...) 语义一致: NaN 视为 0
+    gain = _sliding_mean(np.where(delta > 0, delta, 0.0), period)
+    loss = _sliding_mean(np.where(delta < 0, -delta, 0.0), period)
     
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
     
-    return rsi
+    return pd.Series(rsi, index=prices.index)
 
 
 def calculate_bollinger_bands(prices: pd.Series, period: int = 20, std_dev: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
@@ -69,18 +181,20 @@ def calculate_bollinger_bands(prices: pd.Series, period: int = 20, std_dev: floa
     Returns:
         (中轨, 上轨, 下轨)
     """
-    middle = prices.rolling(window=period).mean()
-    std = prices.rolling(window=period).std()
+    close = prices.to_numpy(dtype=np.float64)
+    middle = _sliding_mean(close, period)
+    std = _sliding_std(close, period)
     
     upper = middle + (std * std_dev)
     lower = middle - (std * std_dev)
     
-    return middle, upper, lower
+    index = prices.index
+    return pd.Series(middle, index=index), pd.Series(upper, index=index), pd.Series(lower, index=index)
 
 
 def calculate_ma(prices: pd.Series, period: int = 5) -> pd.Series:
     """计算移动平均线"""
-    return prices.rolling(window=period).mean()
+    return pd.Series(_sliding_mean(prices.to_numpy(dtype=np.float64), period), index=prices.index)
 
 
 def calculate_ema(prices: pd.Series, period: int = 12) -> pd.Series:
@@ -101,11 +215,18 @@ def calculate_macd(prices: pd.Series, fast: int = 12, slow: int = 26, signal: in
     Returns:
         (DIF, DEA, MACD柱)
     """
-    ema_fast = prices.ewm(span=fast, adjust=False).mean()
-    ema_slow = prices.ewm(span=slow, adjust=False).mean()
-    
-    dif = ema_fast - ema_slow
-    dea = dif.ewm(span=signal, adjust=False).mean()
+    values = prices.to_numpy(dtype=np.float64)
+    if HAS_NUMBA and np.isfinite(values).all():
+        dif_values, dea_values = _macd_kernel(values, fast, slow, signal)
+        dif = pd.Series(dif_values, index=prices.index)
+        dea = pd.Series(dea_values, index=prices.index)
+    else:
+        # 含缺失值时 ewm 的权重衰减规则较复杂, 交给 pandas 处理
+        ema_fast = prices.ewm(span=fast, adjust=False).mean()
+        ema_slow = prices.ewm(span=slow, adjust=False).mean()
+        
+        dif = ema_fast - ema_slow
+        dea = dif.ewm(span=signal, adjust=False).mean()
     macd = (dif - dea) * 2
     
     return dif, dea, macd
@@ -124,12 +245,19 @@ def calculate_kdj(high: pd.Series, low: pd.Series, close: pd.Series, period: int
     Returns:
         (K, D, J)
     """
-    lowest_low = low.rolling(window=period).min()
-    highest_high = high.rolling(window=period).max()
+    lowest_low = _rolling_min(low, period)
+    highest_high = _rolling_max(high, period)
     
     rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
     rsv = rsv.fillna(50)
     
+    values = rsv.to_numpy(dtype=np.float64)
+    if HAS_NUMBA and np.isfinite(values).all():
+        k_values, d_values, j_values = _kdj_kernel(values, 2.0)
+        index = rsv.index
+        return pd.Series(k_values, index=index), pd.Series(d_values, index=index), pd.Series(j_values, index=index)
+    
+    # 最高价等于最低价时 RSV 可能为 inf, 交给 pandas 处理
     k = rsv.ewm(com=2, adjust=False).mean()
     d = k.ewm(com=2, adjust=False).mean()
     j = 3 * k - 2 * d
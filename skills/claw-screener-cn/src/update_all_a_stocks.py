@@ -22,12 +22,9 @@ def get_a_stock_codes() -> list:
     """获取A股股票代码列表"""
     try:
         df = ak.stock_info_a_code_name()
-        codes = []
-        for _, row in df.iterrows():
-            code = row['code']
-            if code.startswith('6') or code.startswith('0') or code.startswith('3'):
-                codes.append((code, row['name']))
-        return codes
+        # 整列按首位筛选沪深主板/创业板, 不逐行构造 Series
+        mask = df['code'].str.startswith(('6', '0', '3'))
+        return list(zip(df.loc[mask, 'code'], df.loc[mask, 'name']))
     except Exception as e:
         print(f"获取股票列表失败: {e}")
         return [(f"{i:06d}", f"股票{i}") for i in range(1, 100)]
@@ -74,7 +71,13 @@ def fetch_kline_sina(symbol: str) -> pd.DataFrame:
         
         # 只保留最近90天
         if len(df) > 90:
-            df = df.tail(90)
+            df = df.tail(90).reset_index(drop=True)
+        
+        # 价格用 float32, 成交量用整数, 减小内存和CSV体积
+        price_cols = ['open', 'high', 'low', 'close']
+        df[price_cols] = df[price_cols].apply(pd.to_numeric, errors='coerce').astype('float32')
+        volume = pd.to_numeric(df['volume'], errors='coerce')
+        df['volume'] = volume.astype('int64') if volume.notna().all() else volume
         
         return df
         
@@ -151,10 +154,10 @@ def update_all_a_stocks(batch_size: int = 50):
     if FINANCIAL_A_FILE.exists():
         try:
             df = pd.read_csv(FINANCIAL_A_FILE)
-            for _, row in df.iterrows():
-                code = row.get('code', '')
-                if code:
-                    existing_financial[code] = row.to_dict()
+            if 'code' in df.columns:
+                # 一次性转为记录列表; 同一代码后出现的记录覆盖先出现的
+                df = df[df['code'].map(bool)]
+                existing_financial = dict(zip(df['code'], df.to_dict('records')))
             print(f"   已有财务记录: {len(existing_financial)} 条")
         except:
             pass
@@ -87,10 +87,10 @@ def update_financial_data(symbols: list) -> dict:
     if PROFIT_FILE.exists():
         try:
             df = pd.read_csv(PROFIT_FILE)
-            for _, row in df.iterrows():
-                code = row.get('code', '')
-                if code:
-                    existing_data[code] = row.to_dict()
+            if 'code' in df.columns:
+                # 一次性转为记录列表; 同一代码后出现的记录覆盖先出现的
+                df = df[df['code'].map(bool)]
+                existing_data = dict(zip(df['code'], df.to_dict('records')))
             print(f"已读取 {len(existing_data)} 条现有记录")
         except Exception as e:
             print(f"读取现有数据失败: {e}")
@@ -107,10 +107,10 @@ def update_financial_batch(batch_size: int = 100):
     if FINANCIAL_FILE.exists():
         try:
             df = pd.read_csv(FINANCIAL_FILE)
-            for _, row in df.iterrows():
-                code = row.get('code', '')
-                if code:
-                    existing[code] = row.to_dict()
+            if 'code' in df.columns:
+                # 一次性转为记录列表; 同一代码后出现的记录覆盖先出现的
+                df = df[df['code'].map(bool)]
+                existing = dict(zip(df['code'], df.to_dict('records')))
             print(f"已有财务记录: {len(existing)} 条")
         except:
             pass
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the accelerated indicator kernels.
+
+Each indicator is checked on both its fast path (numba, enabled here via CLAW_USE_NUMBA, / bottleneck) and its
+fallback path against the plain pandas expressions it replaced, on random
+walks, NaN gaps, flat series, float32 input and series shorter than the window.
+"""
+
+import importlib
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional scientific stack
+    raise unittest.SkipTest("numpy/pandas not installed")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# numba 内核默认关闭, 测试中打开以覆盖快速路径 (模块已先被导入时重新加载)
+os.environ.setdefault("CLAW_USE_NUMBA", "1")
+
+import screening_full as sf
+import screening_local as sl
+import technical_indicators as ti
+
+for _module in (ti, sf):
+    if not _module.HAS_NUMBA:
+        importlib.reload(_module)
+
+
+def _series(values, dtype=np.float64):
+    # 非默认索引, 顺带检查结果是否保留原索引
+    return pd.Series(np.asarray(values, dtype=dtype), index=np.arange(len(values)) + 100)
+
+
+def make_cases():
+    rng = np.random.default_rng(7)
+    walk = 100 + rng.standard_normal(150).cumsum()
+    gaps = walk.copy()
+    gaps[[3, 40, 41, 97]] = np.nan
+    return {
+        "random": (_series(walk), 1e-9),
+        "nan_gaps": (_series(gaps), 1e-9),
+        "flat": (_series(np.full(60, 10.0)), 1e-9),
+        "float32": (_series(walk, np.float32), 1e-5),
+        "short": (_series(walk[:5]), 1e-9),
+        "single": (_series(walk[:1]), 1e-9),
+    }
+
+
+def hl(close):
+    """由收盘价构造固定偏移的最高/最低价"""
+    offset = np.linspace(0.5, 1.5, len(close))
+    return close + offset.astype(close.dtype), close - offset.astype(close.dtype)
+
+
+# ---- 原 pandas 写法 (参考实现) ----
+
+def ref_rsi(prices, period=14):
+    delta = prices.diff()
+    gain = delta.where(delta > 0, 0).rolling(period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(period).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def ref_bollinger(prices, period=20, std_dev=2.0):
+    middle = prices.rolling(period).mean()
+    std = prices.rolling(period).std()
+    return middle, middle + std * std_dev, middle - std * std_dev
+
+
+def ref_macd(prices, fast=12, slow=26, signal=9):
+    dif = prices.ewm(span=fast, adjust=False).mean() - prices.ewm(span=slow, adjust=False).mean()
+    dea = dif.ewm(span=signal, adjust=False).mean()
+    return dif, dea, (dif - dea) * 2
+
+
+def ref_kdj(high, low, close, period=9):
+    lowest_low = low.rolling(period).min()
+    highest_high = high.rolling(period).max()
+    rsv = ((close - lowest_low) / (highest_high - lowest_low) * 100).fillna(50)
+    k = rsv.ewm(com=2, adjust=False).mean()
+    d = k.ewm(com=2, adjust=False).mean()
+    return k, d, 3 * k - 2 * d
+
+
+def ref_williams_r(high, low, close, period=14):
+    highest_high = high.rolling(period).max()
+    lowest_low = low.rolling(period).min()
+    diff = (highest_high - lowest_low).replace(0, np.nan)
+    return (highest_high - close) / diff * -100
+
+
+def assert_close(test, actual, expected, rtol):
+    if isinstance(actual, pd.Series):
+        test.assertTrue(actual.index.equals(expected.index))
+    np.testing.assert_allclose(
+        np.asarray(actual, dtype=np.float64),
+        np.asarray(expected, dtype=np.float64),
+        rtol=rtol, atol=rtol, equal_nan=True,
+    )
+
+
+class PathMixin:
+    """在快速路径和回退路径下分别运行同一断言"""
+
+    module = None
+    fast_flags = ()
+
+    def paths(self):
+        yield "fast", {flag: True for flag in self.fast_flags if getattr(self.module, flag)}
+        yield "fallback", {flag: False for flag in self.fast_flags}
+
+    def for_each_path(self, check):
+        for path, flags in self.paths():
+            for name, (series, rtol) in make_cases().items():
+                with self.subTest(path=path, case=name), patch.multiple(self.module, **flags):
+                    check(series, rtol)
+
+
+class TestTechnicalIndicatorParity(PathMixin, TestCase):
+    module = ti
+    fast_flags = ("HAS_NUMBA", "HAS_BOTTLENECK")
+
+    def test_sliding_mean_and_std(self):
+        def check(s, rtol):
+            values = s.to_numpy(dtype=np.float64)
+            for window in (5, 20):
+                assert_close(self, ti._sliding_mean(values, window), s.rolling(window).mean(), rtol)
+                assert_close(self, ti._sliding_std(values, window), s.rolling(window).std(), rtol)
+        self.for_each_path(check)
+
+    def test_rolling_min_max(self):
+        def check(s, rtol):
+            assert_close(self, ti._rolling_min(s, 9), s.rolling(9).min(), rtol)
+            assert_close(self, ti._rolling_max(s, 9), s.rolling(9).max(), rtol)
+        self.for_each_path(check)
+
+    def test_rsi(self):
+        self.for_each_path(lambda s, rtol: assert_close(self, ti.calculate_rsi(s), ref_rsi(s), rtol))
+
+    def test_bollinger_bands(self):
+        def check(s, rtol):
+            for actual, expected in zip(ti.calculate_bollinger_bands(s), ref_bollinger(s)):
+                assert_close(self, actual, expected, rtol)
+        self.for_each_path(check)
+
+    def test_macd(self):
+        def check(s, rtol):
+            for actual, expected in zip(ti.calculate_macd(s), ref_macd(s)):
+                assert_close(self, actual, expected, rtol)
+        self.for_each_path(check)
+
+    def test_kdj(self):
+        def check(s, rtol):
+            high, low = hl(s)
+            for actual, expected in zip(ti.calculate_kdj(high, low, s), ref_kdj(high, low, s)):
+                assert_close(self, actual, expected, rtol)
+        self.for_each_path(check)
+
+    def test_kdj_with_zero_range(self):
+        # 最高价等于最低价且收盘价在区间外时 RSV 为 inf, 走 pandas 回退
+        for path, flags in self.paths():
+            with self.subTest(path=path), patch.multiple(ti, **flags):
+                close = _series(np.linspace(10, 12, 30))
+                flat = _series(np.full(30, 11.0))
+                for actual, expected in zip(ti.calculate_kdj(flat, flat, close), ref_kdj(flat, flat, close)):
+                    assert_close(self, actual, expected, 1e-9)
+
+    def test_williams_r(self):
+        def check(s, rtol):
+            high, low = hl(s)
+            assert_close(self, ti.calculate_williams_r(high, low, s), ref_williams_r(high, low, s), rtol)
+        self.for_each_path(check)
+
+
+class TestScreeningFullParity(PathMixin, TestCase):
+    module = sf
+    fast_flags = ("HAS_NUMBA",)
+
+    def test_latest_indicators(self):
+        def check(s, rtol):
+            if len(s) == 0:
+                return
+            rsi, bb_lower, dif, dea = sf.calculate_latest_indicators(s)
+            ref_dif, ref_dea, _ = ref_macd(s)
+            assert_close(self, rsi, ref_rsi(s).iloc[-1], rtol)
+            assert_close(self, bb_lower, ref_bollinger(s)[2].iloc[-1], rtol)
+            assert_close(self, dif, ref_dif.iloc[-1], rtol)
+            assert_close(self, dea, ref_dea.iloc[-1], rtol)
+        self.for_each_path(check)
+
+    def test_latest_williams_r(self):
+        def check(s, rtol):
+            high, low = hl(s)
+            actual = sf.latest_williams_r(high, low, s)
+            assert_close(self, actual, ref_williams_r(high, low, s).iloc[-1], rtol)
+        self.for_each_path(check)
+
+
+class TestScreeningLocalParity(TestCase):
+    def test_rsi_and_bollinger(self):
+        for name, (s, rtol) in make_cases().items():
+            with self.subTest(case=name):
+                assert_close(self, sl.calculate_rsi(s), ref_rsi(s), rtol)
+                for actual, expected in zip(sl.calculate_bollinger_bands(s), ref_bollinger(s)):
+                    assert_close(self, actual, expected, rtol)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for the cleaned-kline Parquet cache in screening_local.load_kline.
+
+Cache misses, cache hits (full and row-group tail reads) and the no-pyarrow
+fallback must all return the same frame as the plain pandas cleaning steps,
+and a CSV whose (mtime_ns, size) differs from the version recorded in the
+cache entry must be re-parsed, even when its mtime is older.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase, main
+from unittest.mock import patch
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional scientific stack
+    raise unittest.SkipTest("numpy/pandas not installed")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import screening_full as sf
+import screening_local as sl
+
+COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def write_kline_csv(path: Path, rows: int, seed: int = 3):
+    """写入日期乱序、含无法解析数值和多余列的行情CSV"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=rows, freq="D")
+    close = 10 + rng.standard_normal(rows).cumsum()
+    df = pd.DataFrame({
+        'date': dates.strftime("%Y-%m-%d"),
+        'open': close + 0.1,
+        'high': close + 0.5,
+        'low': close - 0.5,
+        'close': close,
+        'volume': rng.integers(1000, 5000, rows).astype(float),
+        'amount': close * 1000,
+    })
+    df['close'] = df['close'].astype(object)
+    df.loc[rows // 2, 'close'] = "--"
+    df = df.sample(frac=1.0, random_state=seed)
+    df.to_csv(path, index=False)
+
+
+def ref_load(file_path: Path, days=None):
+    """原清洗写法: 读取、转换日期和数值、按日期排序"""
+    df = pd.read_csv(file_path)
+    df = df[COLUMNS].copy()
+    df['date'] = pd.to_datetime(df['date'])
+    for col in COLUMNS[1:]:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.sort_values('date').reset_index(drop=True)
+    if days is not None:
+        df = df.tail(days).reset_index(drop=True)
+    return df
+
+
+class KlineCacheTestCase(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.data_dir = root / "stocks_clean"
+        self.data_dir.mkdir()
+        self.csv_path = self.data_dir / "sh.600000.csv"
+        write_kline_csv(self.csv_path, 100)
+        patcher = patch.multiple(sl, KLINE_CACHE_DIR=root / "cache", KLINE_ROW_GROUP_SIZE=8)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def cache_path(self):
+        return sl.KLINE_CACHE_DIR / f"{self.data_dir.name}_{self.csv_path.stem}.parquet"
+
+    def assert_frame(self, actual, expected):
+        pd.testing.assert_frame_equal(
+            actual.reset_index(drop=True)[COLUMNS],
+            expected[COLUMNS],
+            check_dtype=False,
+        )
+
+
+@unittest.skipUnless(sl.HAS_PARQUET, "pyarrow not installed")
+class TestParquetCache(KlineCacheTestCase):
+    def test_miss_and_hit_match_pandas(self):
+        for days in (None, 5, 8, 20, 100, 500):
+            with self.subTest(days=days):
+                expected = ref_load(self.csv_path, days)
+                if self.cache_path().exists():
+                    self.cache_path().unlink()
+                self.assert_frame(sl.load_kline(self.csv_path, days), expected)
+                self.assertTrue(self.cache_path().exists())
+                self.assert_frame(sl.load_kline(self.csv_path, days), expected)
+
+    def test_hit_skips_csv(self):
+        sl.load_kline(self.csv_path)
+        expected = ref_load(self.csv_path, 30)
+        with patch.object(sl.pd, "read_csv", side_effect=AssertionError("CSV re-read")):
+            self.assert_frame(sl.load_kline(self.csv_path, 30), expected)
+
+    def test_newer_csv_invalidates_cache(self):
+        sl.load_kline(self.csv_path)
+        write_kline_csv(self.csv_path, 60, seed=11)
+        cache_mtime = self.cache_path().stat().st_mtime
+        os.utime(self.csv_path, (cache_mtime + 10, cache_mtime + 10))
+        self.assert_frame(sl.load_kline(self.csv_path), ref_load(self.csv_path))
+        self.assert_frame(sl.load_kline(self.csv_path, 10), ref_load(self.csv_path, 10))
+
+    def test_replaced_csv_with_older_mtime_invalidates_cache(self):
+        # cp -p / rsync 会保留源文件较旧的 mtime
+        old_mtime = self.csv_path.stat().st_mtime - 3600
+        sl.load_kline(self.csv_path)
+        write_kline_csv(self.csv_path, 70, seed=13)
+        os.utime(self.csv_path, (old_mtime, old_mtime))
+        self.assertLess(self.csv_path.stat().st_mtime, self.cache_path().stat().st_mtime)
+        self.assert_frame(sl.load_kline(self.csv_path), ref_load(self.csv_path))
+
+    def test_same_mtime_different_size_invalidates_cache(self):
+        stat = self.csv_path.stat()
+        sl.load_kline(self.csv_path)
+        write_kline_csv(self.csv_path, 80, seed=17)
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assert_frame(sl.load_kline(self.csv_path), ref_load(self.csv_path))
+
+    def test_corrupt_cache_is_rebuilt(self):
+        sl.load_kline(self.csv_path)
+        self.cache_path().write_bytes(b"not parquet")
+        self.assert_frame(sl.load_kline(self.csv_path, 20), ref_load(self.csv_path, 20))
+        self.assert_frame(sl.load_kline(self.csv_path, 20), ref_load(self.csv_path, 20))
+
+    def test_no_temp_files_left(self):
+        sl.load_kline(self.csv_path)
+        self.assertEqual([p.name for p in sl.KLINE_CACHE_DIR.iterdir()], [self.cache_path().name])
+
+    def test_missing_columns(self):
+        pd.DataFrame({'date': ["2024-01-01"], 'close': [1.0]}).to_csv(self.csv_path, index=False)
+        self.assertIsNone(sl.load_kline(self.csv_path))
+        self.assertFalse(self.cache_path().exists())
+
+
+class TestWithoutParquet(KlineCacheTestCase):
+    def test_local_fallback_matches_pandas(self):
+        with patch.multiple(sl, HAS_PARQUET=False, CSV_ENGINE='c'):
+            for days in (None, 5, 500):
+                with self.subTest(days=days):
+                    self.assert_frame(sl.load_kline(self.csv_path, days), ref_load(self.csv_path, days))
+        self.assertFalse(self.cache_path().exists())
+
+    def test_full_fallback_matches_pandas(self):
+        for has_parquet in sorted({False, sl.HAS_PARQUET}):
+            with self.subTest(has_parquet=has_parquet), patch.object(sf, "HAS_PARQUET", has_parquet):
+                self.assert_frame(sf.load_recent_kline(self.csv_path, 30), ref_load(self.csv_path, 30))
+
+
+if __name__ == "__main__":
+    main()
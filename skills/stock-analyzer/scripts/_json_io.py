@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+JSON 报告写出
+
+优先使用 orjson (更快, 原生支持 numpy 标量), 未安装时退回标准库 json
+"""
+import json
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dump_json(obj, path):
+    """以2空格缩进写出 JSON 文件 (UTF-8, 中文不转义)"""
+    if HAS_ORJSON:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
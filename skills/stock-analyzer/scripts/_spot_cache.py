@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+A股实时行情快照缓存
+
+ak.stock_zh_a_spot_em() 每次下载约 5000 行全市场数据,
+同一轮定时任务中多个脚本/函数共用一份磁盘快照, 只请求一次接口。
+stock-analyzer 自身及一同安装的 claw-screener-cn 均通过本模块读取, 缓存位置和有效期只在此处定义。
+"""
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CACHE_DIR = Path("/tmp/ak_spot_cache")
+
+
+def _cache_path() -> Path:
+    return CACHE_DIR / f"spot_em_{datetime.now().strftime('%Y%m%d')}.pkl"
+
+
+def get_spot(max_age_minutes: int = 30):
+    """
+    获取全市场实时行情 (带磁盘缓存)
+
+    缓存按日期分文件, 开盘(09:00)前写入的快照或超过 max_age_minutes
+    的快照视为过期, 重新请求接口。
+
+    Args:
+        max_age_minutes: 快照最长有效时间(分钟)
+
+    Returns:
+        ak.stock_zh_a_spot_em() 返回的 DataFrame
+    """
+    path = _cache_path()
+    now = datetime.now()
+
+    if path.exists():
+        try:
+            mtime = datetime.fromtimestamp(path.stat().st_mtime)
+            market_open = now.replace(hour=9, minute=0, second=0, microsecond=0)
+            stale = now - mtime > timedelta(minutes=max_age_minutes)
+            if now >= market_open > mtime:
+                stale = True
+            if not stale:
+                with open(path, 'rb') as f:
+                    return pickle.load(f)
+        except Exception:
+            pass
+
+    import akshare as ak
+    df = ak.stock_zh_a_spot_em()
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(df, f)
+        tmp_path.replace(path)
+    except Exception:
+        pass
+
+    return df
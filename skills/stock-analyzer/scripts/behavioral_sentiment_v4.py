@@ -20,6 +20,11 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+from _json_io import dump_json
+
 # 配置
 DATA_DIR = Path("/home/liujerry/金融数据")
 PYTHON_BIN = "/home/liujerry/moltbot/openclaw_py/bin/python"
@@ -142,29 +147,40 @@ def load_economic_summary():
         return None
 
 
+def count_breadth(changes, limit_down=False):
+    """
+    涨跌家数统计
+    
+    changes: 涨跌幅(%)序列, 可为 list / Series / ndarray, 无法解析的值视为缺失
+    limit_down: 是否统计跌停家数 (仅创业板全量数据源输出该项)
+    在同一个数组上一次性比较计数, 不再逐条遍历或反复过滤 DataFrame
+    """
+    arr = pd.to_numeric(pd.Series(changes), errors='coerce').to_numpy(dtype=float)
+    stats = {
+        "上涨": int(np.count_nonzero(arr > 0)),
+        "下跌": int(np.count_nonzero(arr < 0)),
+        "平盘": int(np.count_nonzero(arr == 0)),
+        "涨停": int(np.count_nonzero(arr >= 9.9)),
+    }
+    if limit_down:
+        stats["跌停"] = int(np.count_nonzero(arr <= -9.9))
+    stats["总成交"] = len(arr)
+    return stats
+
+
 def get_market_sentiment():
     """获取市场情绪数据 - 多数据源"""
     log("📊 获取市场情绪数据...")
     
     # 数据源1: akshare 实时行情 (可能失败)
     def source_akshare():
-        import akshare as ak
+        from _spot_cache import get_spot
         try:
-            stock_zh_a_spot_em = ak.stock_zh_a_spot_em()
-            
-            up_count = len(stock_zh_a_spot_em[stock_zh_a_spot_em['涨跌幅'] > 0])
-            down_count = len(stock_zh_a_spot_em[stock_zh_a_spot_em['涨跌幅'] < 0])
-            flat_count = len(stock_zh_a_spot_em[stock_zh_a_spot_em['涨跌幅'] == 0])
-            limit_up = len(stock_zh_a_spot_em[stock_zh_a_spot_em['涨跌幅'] >= 9.9])
+            stock_zh_a_spot_em = get_spot()
             
-            return {
-                "上涨": up_count,
-                "下跌": down_count,
-                "平盘": flat_count,
-                "涨停": limit_up,
-                "总成交": len(stock_zh_a_spot_em),
-                "source": "akshare"
-            }
+            stats = count_breadth(stock_zh_a_spot_em['涨跌幅'])
+            stats["source"] = "akshare"
+            return stats
         except Exception as e:
             log(f"  ⚠️ akshare实时行情失败: {type(e).__name__}")
             return None
@@ -205,24 +221,11 @@ def get_market_sentiment():
                         pass
             
             if len(changes) > 0:
-                up = sum(1 for c in changes if c > 0)
-                down = sum(1 for c in changes if c < 0)
-                flat = sum(1 for c in changes if c == 0)
-                limit_up = sum(1 for c in changes if c >= 9.9)
-                limit_down = sum(1 for c in changes if c <= -9.9)
-                total = len(changes)
+                stats = count_breadth(changes, limit_down=True)
+                log(f"  ✅ 获取创业板 {stats['总成交']} 只数据")
                 
-                log(f"  ✅ 获取创业板 {total} 只数据")
-                
-                return {
-                    "上涨": up,
-                    "下跌": down,
-                    "平盘": flat,
-                    "涨停": limit_up,
-                    "跌停": limit_down,
-                    "总成交": total,
-                    "source": "创业板全量"
-                }
+                stats["source"] = "创业板全量"
+                return stats
         except Exception as e:
             log(f"  ⚠️ 创业板数据获取失败: {type(e).__name__}")
         return None
@@ -230,7 +233,6 @@ def get_market_sentiment():
     # 数据源2: baostock
     def source_baostock():
         import baostock as bs
-        import pandas as pd
         
         lg = bs.login()
         # 获取所有A股实时行情
@@ -249,19 +251,9 @@ def get_market_sentiment():
         if 'changePercent' in df.columns:
             df['涨跌幅'] = pd.to_numeric(df['changePercent'], errors='coerce')
         
-        up_count = len(df[df['涨跌幅'] > 0]) if '涨跌幅' in df.columns else 0
-        down_count = len(df[df['涨跌幅'] < 0]) if '涨跌幅' in df.columns else 0
-        flat_count = len(df[df['涨跌幅'] == 0]) if '涨跌幅' in df.columns else 0
-        limit_up = len(df[df['涨跌幅'] >= 9.9]) if '涨跌幅' in df.columns else 0
-        
-        return {
-            "上涨": up_count,
-            "下跌": down_count,
-            "平盘": flat_count,
-            "涨停": limit_up,
-            "总成交": len(df),
-            "source": "baostock"
-        }
+        stats = count_breadth(df['涨跌幅'] if '涨跌幅' in df.columns else [None] * len(df))
+        stats["source"] = "baostock"
+        return stats
     
     # 数据源3: sina (网页爬取)
     def source_sina():
@@ -283,19 +275,10 @@ def get_market_sentiment():
         
         if data.get('data') and data['data'].get('diff'):
             stocks = data['data']['diff']
-            up = sum(1 for s in stocks if float(s.get('f3', 0)) > 0)
-            down = sum(1 for s in stocks if float(s.get('f3', 0)) < 0)
-            flat = sum(1 for s in stocks if float(s.get('f3', 0)) == 0)
-            limit_up = sum(1 for s in stocks if float(s.get('f3', 0)) >= 9.9)
-            
-            return {
-                "上涨": up,
-                "下跌": down,
-                "平盘": flat,
-                "涨停": limit_up,
-                "总成交": len(stocks),
-                "source": "sina/eastmoney"
-            }
+            # 停牌股票 f3 为 '-', 按缺失值处理
+            stats = count_breadth([s.get('f3', 0) for s in stocks])
+            stats["source"] = "sina/eastmoney"
+            return stats
         return None
     
     # 尝试多个数据源
@@ -358,20 +341,21 @@ def get_fund_flow():
         if df is None or len(df) == 0:
             return None
         
-        # 汇总北向资金（沪股通+深股通）
-        north_money = 0
-        north_up = north_down = 0
+        # 汇总北向资金（沪股通+深股通）: 按列筛选后整列求和, 缺列或缺失值记为 0
+        if '资金方向' in df.columns and '板块' in df.columns:
+            north = df[(df['资金方向'] == '北向') & df['板块'].isin(['沪股通', '深股通'])]
+        else:
+            north = df.iloc[:0]
         
-        for _, row in df.iterrows():
-            if row.get('资金方向') == '北向' and row.get('板块') in ['沪股通', '深股通']:
-                north_money += float(row.get('成交净买额', 0) or 0)
-                north_up += int(row.get('上涨数', 0) or 0)
-                north_down += int(row.get('下跌数', 0) or 0)
+        def col_sum(name):
+            if name not in north.columns:
+                return 0.0
+            return float(pd.to_numeric(north[name], errors='coerce').fillna(0).sum())
         
         return {
-            "北向资金": north_money,
-            "北向上涨": north_up,
-            "北向下跌": north_down,
+            "北向资金": col_sum('成交净买额'),
+            "北向上涨": int(col_sum('上涨数')),
+            "北向下跌": int(col_sum('下跌数')),
             "source": "北向资金"
         }
     
@@ -636,8 +620,7 @@ def main():
         "market": market_sentiment,
         "fund": fund_flow
     }
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    dump_json(json_data, json_file)
     
     log(f"📄 JSON数据: {json_file}")
     
@@ -70,9 +70,9 @@ class StockDataFetcher:
         
         df = pd.DataFrame(data, columns=['date', 'code', 'open', 'high', 'low', 'close', 'volume', 'amount', 'turn'])
         
-        # 转换为数值类型
-        for col in ['open', 'high', 'low', 'close', 'volume', 'amount', 'turn']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # 转换为数值类型 (一次性转换全部数值列)
+        numeric_cols = ['open', 'high', 'low', 'close', 'volume', 'amount', 'turn']
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
         
         return df.tail(days)
     
@@ -84,54 +84,69 @@ class StockDataFetcher:
             dict: RSI, 布林带, MACD, MA 等
         """
         close = df['close']
+        values = close.to_numpy(dtype=np.float64)
+        
+        # 只需要最新一日的值, 滚动类指标只对最后一个窗口归约, 不生成整条滚动序列
+        # (窗口不足或窗口内有缺失时为 NaN, 与 rolling(n) 末值一致)
+        def tail_mean(x, n):
+            return x[-n:].mean() if len(x) >= n else np.nan
+        
+        def tail_std(x, n):
+            return x[-n:].std(ddof=1) if len(x) >= n else np.nan
+        
+        # 涨跌幅分解只计算一次, 供 RSI(6) 和 RSI(14) 共用 (首日及缺失的变动记为 0)
+        delta = np.diff(values, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
         
         # RSI(6) 和 RSI(14)
-        def calc_rsi(p, n):
-            d = p.diff()
-            g = d.where(d > 0, 0).rolling(n).mean()
-            l = (-d.where(d < 0, 0)).rolling(n).mean()
-            return 100 - (100 / (1 + g / l))
-        
-        rsi6 = calc_rsi(close, 6)
-        rsi14 = calc_rsi(close, 14)
-        
-        # 布林带
-        ma20 = close.rolling(20).mean()
-        std20 = close.rolling(20).std()
-        upper = ma20 + 2 * std20
-        lower = ma20 - 2 * std20
-        
-        # MACD
+        def calc_rsi(n):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return 100 - (100 / (1 + tail_mean(gain, n) / tail_mean(loss, n)))
+        
+        rsi6 = calc_rsi(6)
+        rsi14 = calc_rsi(14)
+        
+        # 布林带 (中轨即 MA20, 下方均线复用)
+        ma20 = tail_mean(values, 20)
+        std20 = tail_std(values, 20)
+        upper_last = ma20 + 2 * std20
+        lower_last = ma20 - 2 * std20
+        
+        # MACD (EMA 为递推量, 仍需整条序列)
         ema12 = close.ewm(span=12).mean()
         ema26 = close.ewm(span=26).mean()
         macd = ema12 - ema26
         signal = macd.ewm(span=9).mean()
         
         # MA
-        ma5 = close.rolling(5).mean()
-        ma10 = close.rolling(10).mean()
-        ma20 = close.rolling(20).mean()
+        ma5 = tail_mean(values, 5)
+        ma10 = tail_mean(values, 10)
         
         # 成交量均线
-        vol_ma5 = df['volume'].rolling(5).mean()
+        vol_ma5 = tail_mean(df['volume'].to_numpy(dtype=np.float64), 5)
         
         price = close.iloc[-1]
         
+        # 缺失时使用默认值
+        def last(value, default, ndigits):
+            return default if pd.isna(value) else round(value, ndigits)
+        
         return {
             'close': round(price, 2),
-            'rsi6': round(rsi6.iloc[-1], 1) if not pd.isna(rsi6.iloc[-1]) else 50,
-            'rsi14': round(rsi14.iloc[-1], 1) if not pd.isna(rsi14.iloc[-1]) else 50,
-            'upper_band': round(upper.iloc[-1], 2) if not pd.isna(upper.iloc[-1]) else price,
-            'lower_band': round(lower.iloc[-1], 2) if not pd.isna(lower.iloc[-1]) else price,
-            'ma5': round(ma5.iloc[-1], 2) if not pd.isna(ma5.iloc[-1]) else price,
-            'ma10': round(ma10.iloc[-1], 2) if not pd.isna(ma10.iloc[-1]) else price,
-            'ma20': round(ma20.iloc[-1], 2) if not pd.isna(ma20.iloc[-1]) else price,
-            'macd': round(macd.iloc[-1], 2) if not pd.isna(macd.iloc[-1]) else 0,
-            'signal_line': round(signal.iloc[-1], 2) if not pd.isna(signal.iloc[-1]) else 0,
+            'rsi6': last(rsi6, 50, 1),
+            'rsi14': last(rsi14, 50, 1),
+            'upper_band': last(upper_last, price, 2),
+            'lower_band': last(lower_last, price, 2),
+            'ma5': last(ma5, price, 2),
+            'ma10': last(ma10, price, 2),
+            'ma20': last(ma20, price, 2),
+            'macd': last(macd.iat[-1], 0, 2),
+            'signal_line': last(signal.iat[-1], 0, 2),
             'volume': int(df['volume'].iloc[-1]),
-            'volume_ma5': round(vol_ma5.iloc[-1], 0) if not pd.isna(vol_ma5.iloc[-1]) else 0,
-            'near_lower_band': price <= lower.iloc[-1] * 1.05 if not pd.isna(lower.iloc[-1]) else False,
-            'near_upper_band': price >= upper.iloc[-1] * 0.95 if not pd.isna(upper.iloc[-1]) else False,
+            'volume_ma5': last(vol_ma5, 0, 0),
+            'near_lower_band': price <= lower_last * 1.05 if not pd.isna(lower_last) else False,
+            'near_upper_band': price >= upper_last * 0.95 if not pd.isna(upper_last) else False,
         }
     
     def analyze_stock(self, code: str) -> Optional[Dict]:
@@ -184,35 +199,37 @@ class StockDataFetcher:
         - 价格触及布林带下轨: 买入信号
         - RSI(14) < 30: 关注
         """
-        signals = []
+        if not stocks:
+            return []
+        
+        rsi14 = np.array([s.get('rsi14', 50) for s in stocks], dtype=float)
+        rsi6 = np.array([s.get('rsi6', 50) for s in stocks], dtype=float)
+        price = np.array([s.get('close', 0) for s in stocks], dtype=float)
+        lower = np.array([s.get('lower_band', s.get('close', 0)) for s in stocks], dtype=float)
+        
+        # 保守策略判断 (按优先级排列, 一次性对全部股票求值)
+        conditions = [
+            (rsi14 < 20) & (price <= lower * 1.05),
+            rsi14 < 20,
+            rsi6 < 20,
+            rsi14 < 30,
+        ]
+        rules = [
+            ('买入', 'RSI14={rsi14}<20, 价格触及布林下轨'),
+            ('关注', 'RSI14={rsi14}<20 超卖'),
+            ('关注', 'RSI6={rsi6}<20 短期超卖'),
+            ('关注', 'RSI14={rsi14}<30 接近超卖'),
+            ('观望', 'RSI14={rsi14} 正常区间'),
+        ]
+        rule_index = np.select(conditions, range(len(conditions)), default=len(conditions))
         
-        for stock in stocks:
-            rsi14 = stock.get('rsi14', 50)
-            rsi6 = stock.get('rsi6', 50)
-            price = stock.get('close', 0)
-            lower = stock.get('lower_band', price)
-            
-            # 保守策略判断
-            if rsi14 < 20 and price <= lower * 1.05:
-                signal = '买入'
-                reason = f'RSI14={rsi14}<20, 价格触及布林下轨'
-            elif rsi14 < 20:
-                signal = '关注'
-                reason = f'RSI14={rsi14}<20 超卖'
-            elif rsi6 < 20:
-                signal = '关注'
-                reason = f'RSI6={rsi6}<20 短期超卖'
-            elif rsi14 < 30:
-                signal = '关注'
-                reason = f'RSI14={rsi14}<30 接近超卖'
-            else:
-                signal = '观望'
-                reason = f'RSI14={rsi14} 正常区间'
-            
+        signals = []
+        for stock, idx in zip(stocks, rule_index):
+            signal, reason = rules[idx]
             signals.append({
                 **stock,
                 'signal': signal,
-                'reason': reason
+                'reason': reason.format(rsi14=stock.get('rsi14', 50), rsi6=stock.get('rsi6', 50)),
             })
         
         return signals
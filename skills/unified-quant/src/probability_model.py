@@ -18,7 +18,43 @@ class WinProbabilityModel:
     def load_historical_data(self, stock_code: str, df: pd.DataFrame):
         """加载历史数据"""
         self.historical_data[stock_code] = df
+    
+    @staticmethod
+    def _indicator(df: pd.DataFrame, name: str, compute) -> pd.Series:
+        """
+        取行情表上的指标列, 首次使用时计算并保存
         
+        指标只依赖收盘价, 同一只股票重复评估 (如 get_optimal_strategy 后再 generate_signal)
+        时直接复用, 不再重复滚动计算
+        """
+        if name not in df.columns:
+            df[name] = compute()
+        return df[name]
+        
+    def _breakout_signal(self, df: pd.DataFrame, close: pd.Series) -> pd.Series:
+        """突破策略: 收盘价突破20日高点"""
+        high_20 = self._indicator(df, 'high_20', lambda: close.rolling(20).max())
+        return close > high_20.shift(1)
+    
+    def _momentum_signal(self, df: pd.DataFrame, close: pd.Series) -> pd.Series:
+        """动量策略: 5日均线>20日均线"""
+        ma5 = self._indicator(df, 'ma5', lambda: close.rolling(5).mean())
+        ma20 = self._indicator(df, 'ma20', lambda: close.rolling(20).mean())
+        return ma5 > ma20
+    
+    def _reversal_signal(self, df: pd.DataFrame, close: pd.Series) -> pd.Series:
+        """反转策略: 超卖后反弹"""
+        low_20 = self._indicator(df, 'low_20', lambda: close.rolling(20).min())
+        return close < low_20 * 1.05
+    
+    # 入场策略 -> 信号规则; 统计流程由 calculate_entry_probability 统一完成,
+    # get_optimal_strategy 按此顺序逐个评估
+    ENTRY_SIGNALS = {
+        "breakout": _breakout_signal,
+        "momentum": _momentum_signal,
+        "reversal": _reversal_signal,
+    }
+    
     def calculate_entry_probability(self, stock_code: str, 
                                    signal_type: str = "breakout") -> Dict:
         """
@@ -36,66 +72,66 @@ class WinProbabilityModel:
         
         df = self.historical_data[stock_code]
         
+        close = df['close']
+        
+        # 信号后N天收益与信号类型无关, 每只股票只算一次, 各策略共用
+        N = 5  # 5天后收益
+        self._indicator(df, 'future_return', lambda: close.shift(-N) / close - 1)
+        
         # 根据信号类型计算概率
-        if signal_type == "breakout":
-            # 突破策略: 收盘价突破20日高点
-            df['high_20'] = df['close'].rolling(20).max()
-            df['breakout_signal'] = df['close'] > df['high_20'].shift(1)
-            
-            # 计算突破后N天收益
-            N = 5  # 5天后收益
-            df['future_return'] = df['close'].shift(-N) / df['close'] - 1
-            
-            # 筛选突破信号
-            signals = df[df['breakout_signal']].dropna()
-            
-        elif signal_type == "momentum":
-            # 动量策略: 5日均线>20日均线
-            df['ma5'] = df['close'].rolling(5).mean()
-            df['ma20'] = df['close'].rolling(20).mean()
-            df['momentum_signal'] = df['ma5'] > df['ma20']
-            
-            signals = df[df['momentum_signal']].dropna()
-            
-        elif signal_type == "reversal":
-            # 反转策略: 超卖后反弹
-            df['low_20'] = df['close'].rolling(20).min()
-            df['reversal_signal'] = df['close'] < df['low_20'] * 1.05
-            
-            signals = df[df['reversal_signal']].dropna()
+        build_signal = self.ENTRY_SIGNALS.get(signal_type)
+        if build_signal is None:
+            return {"error": f"Unknown signal type: {signal_type}"}
+        df[f'{signal_type}_signal'] = signal_mask = build_signal(self, df, close)
+        
+        # 信号行中任一列缺失即剔除 (与 dropna 一致), 只取收益列, 不复制信号子表
+        valid = signal_mask & df.notna().all(axis=1)
         
         # 计算获胜概率
-        if len(signals) == 0:
+        if not valid.any():
             return {"error": "No signals found"}
         
-        future_returns = signals['future_return'].dropna()
+        future_returns = df.loc[valid, 'future_return'].to_numpy(dtype=np.float64)
         
-        # 统计
+        # 统计 (在同一数组上一次性计算, 避免反复经过 pandas 调度)
         total = len(future_returns)
-        wins = (future_returns > 0).sum()
-        losses = (future_returns < 0).sum()
-        breaks = total - wins - losses
-        
-        win_rate = wins / total * 100 if total > 0 else 0
-        avg_return = future_returns.mean() * 100 if len(future_returns) > 0 else 0
-        median_return = future_returns.median() * 100 if len(future_returns) > 0 else 0
+        if total == 0:
+            return {
+                "strategy": signal_type,
+                "stock_code": stock_code,
+                "sample_size": 0,
+                "win_rate": 0,
+                "loss_rate": 0,
+                "avg_return_pct": 0,
+                "median_return_pct": 0,
+                "confidence_interval_95": [0, 100],
+                "best_case_pct": 0,
+                "worst_case_pct": 0,
+            }
+        
+        wins = int(np.count_nonzero(future_returns > 0))
+        losses = int(np.count_nonzero(future_returns < 0))
+        
+        win_rate = wins / total * 100
+        avg_return = future_returns.mean() * 100
+        median_return = np.median(future_returns) * 100
         
         # 置信区间 (95%)
-        std = future_returns.std() * 100 if len(future_returns) > 1 else 0
-        ci_lower = win_rate - 1.96 * np.sqrt(win_rate * (100 - win_rate) / total) if total > 0 else 0
-        ci_upper = win_rate + 1.96 * np.sqrt(win_rate * (100 - win_rate) / total) if total > 0 else 100
+        margin = 1.96 * np.sqrt(win_rate * (100 - win_rate) / total)
+        ci_lower = win_rate - margin
+        ci_upper = win_rate + margin
         
         return {
             "strategy": signal_type,
             "stock_code": stock_code,
             "sample_size": total,
             "win_rate": round(win_rate, 2),
-            "loss_rate": round(losses / total * 100, 2) if total > 0 else 0,
+            "loss_rate": round(losses / total * 100, 2),
             "avg_return_pct": round(avg_return, 2),
             "median_return_pct": round(median_return, 2),
             "confidence_interval_95": [round(ci_lower, 2), round(ci_upper, 2)],
-            "best_case_pct": round(future_returns.max() * 100, 2) if len(future_returns) > 0 else 0,
-            "worst_case_pct": round(future_returns.min() * 100, 2) if len(future_returns) > 0 else 0,
+            "best_case_pct": round(future_returns.max() * 100, 2),
+            "worst_case_pct": round(future_returns.min() * 100, 2),
         }
     
     def calculate_exit_probability(self, stock_code: str,
@@ -110,21 +146,23 @@ class WinProbabilityModel:
         if len(df) < hold_days + 10:
             return {"error": "Insufficient data"}
         
-        returns = []
-        for i in range(len(df) - hold_days):
-            ret = (df['close'].iloc[i + hold_days] / df['close'].iloc[i] - 1) * 100
-            returns.append(ret)
+        # 持有 hold_days 天的收益: 收盘价数组错位相除, 一次算出全部起点
+        close = df['close'].to_numpy(dtype=np.float64)
+        returns = (close[hold_days:] / close[:len(close) - hold_days] - 1) * 100
         
-        returns = np.array(returns)
+        # 盈亏掩码各只算一次, 胜率与盈亏比共用
+        gains = returns > 0
+        losses = returns < 0
+        has_loss = losses.any()
         
         return {
             "hold_days": hold_days,
             "sample_size": len(returns),
-            "win_rate": round((returns > 0).sum() / len(returns) * 100, 2),
+            "win_rate": round(np.count_nonzero(gains) / len(returns) * 100, 2),
             "avg_return_pct": round(returns.mean(), 2),
             "median_return_pct": round(np.median(returns), 2),
             "std_pct": round(returns.std(), 2),
-            "profit_factor": round(returns[returns > 0].sum() / abs(returns[returns < 0].sum()), 2) if (returns < 0).sum() > 0 else 0,
+            "profit_factor": round(returns[gains].sum() / -returns[losses].sum(), 2) if has_loss else 0,
         }
     
     def get_optimal_strategy(self, stock_code: str) -> Dict:
@@ -132,7 +170,7 @@ class WinProbabilityModel:
         results = {}
         
         # 测试所有策略
-        for strategy in ["breakout", "momentum", "reversal"]:
+        for strategy in self.ENTRY_SIGNALS:
             try:
                 result = self.calculate_entry_probability(stock_code, strategy)
                 if "error" not in result:
@@ -7,12 +7,22 @@
 import akshare as ak
 import baostock as bs
 import pandas as pd
-import json
 import glob
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+# pyarrow.dataset 可一次扫描全部批次文件 (多线程解析 + 列裁剪 + 行过滤)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.dataset as pads
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # ========== 配置 ==========
 WATCHLIST = [
     ('300276', '三丰智能'),
@@ -33,27 +43,48 @@ WATCHLIST = [
 
 DATA_DIR = Path("/home/liujerry/金融数据/fundamentals")
 OUTPUT_DIR = Path("/home/liujerry/reports")
+MAX_WORKERS = 8
 
 # ========== 工具函数 ==========
-def calc_rsi(p, n=14):
-    """计算RSI"""
-    d = p.diff()
-    g = d.where(d>0, 0).rolling(n).mean()
-    l = (-d.where(d<0, 0)).rolling(n).mean()
-    return 100 - (100/(1+g/l))
+def _tail_matrix(closes, width):
+    """将各股收盘价尾部右对齐堆叠为 (N, width) 矩阵, 不足部分填 NaN"""
+    mat = np.full((len(closes), width), np.nan)
+    lengths = np.empty(len(closes), dtype=np.int64)
+    for i, values in enumerate(closes):
+        tail = values[-width:]
+        mat[i, width - len(tail):] = tail
+        lengths[i] = len(values)
+    return mat, lengths
 
-def calc_bb(p, n=20):
-    """计算布林带"""
-    ma = p.rolling(n).mean()
-    std = p.rolling(n).std()
-    return ma, ma+2*std, ma-2*std
+def calc_latest_rsi_bb(closes, rsi_n=14, bb_n=20):
+    """
+    批量计算全部股票最新一日的 RSI 和布林下轨
+    
+    RSI = 100 - 100 / (1 + 平均涨幅 / 平均跌幅), 取最近 rsi_n 个涨跌幅的简单平均;
+    布林下轨 = 最近 bb_n 日收盘价均值 - 2 × 样本标准差 (ddof=1)。
+    只需对 (N, 窗口) 矩阵做几次按行归约, 数据不足的股票为 NaN
+    """
+    mat, lengths = _tail_matrix(closes, max(rsi_n + 1, bb_n))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = np.diff(mat[:, -(rsi_n + 1):], axis=1)
+        g = np.where(d > 0, d, 0).mean(axis=1)
+        l = np.where(d < 0, -d, 0).mean(axis=1)
+        rsi = 100 - 100 / (1 + g / l)
+    rsi[lengths < rsi_n] = np.nan
+    
+    win = mat[:, -bb_n:]
+    lower = win.mean(axis=1) - 2 * win.std(axis=1, ddof=1)
+    lower[lengths < bb_n] = np.nan
+    return rsi, lower
 
 # ========== 获取技术面数据 ==========
 def get_technical_data():
     """获取技术面数据"""
     print("获取技术面数据...")
     lg = bs.login()
-    results = []
+    stocks = []
+    closes = []
     
     for code, name in WATCHLIST:
         full_code = f'sz.{code}'
@@ -66,15 +97,22 @@ def get_technical_data():
             continue
         
         df = pd.DataFrame(data, columns=['date','close'])
-        df['close'] = pd.to_numeric(df['close'], errors='coerce').dropna()
-        
-        # 计算指标
-        rsi = calc_rsi(df['close'], 14)
-        ma20, upper, lower = calc_bb(df['close'], 20)
-        
-        price = df['close'].iloc[-1]
-        rsi_val = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
-        lower_val = lower.iloc[-1] if not pd.isna(lower.iloc[-1]) else price
+        # 只做一次类型转换和去空值, 指标在全部股票取完后统一计算
+        close = pd.to_numeric(df['close'], errors='coerce').dropna().to_numpy(dtype=np.float64)
+        if len(close) == 0:
+            continue
+        stocks.append((code, name))
+        closes.append(close)
+    
+    bs.logout()
+    
+    rsi_all, lower_all = calc_latest_rsi_bb(closes)
+    
+    results = []
+    for (code, name), close, rsi_last, lower_last in zip(stocks, closes, rsi_all, lower_all):
+        price = close[-1]
+        rsi_val = rsi_last if not pd.isna(rsi_last) else 50
+        lower_val = lower_last if not pd.isna(lower_last) else price
         
         # 信号判断
         if rsi_val < 20 and price <= lower_val * 1.05:
@@ -93,10 +131,34 @@ def get_technical_data():
             'signal': signal,
         })
     
-    bs.logout()
     return results
 
 # ========== 获取基本面数据 ==========
+FUNDAMENTAL_COLUMNS = ['code', '报告期', '净资产收益率', '销售净利率', '销售毛利率', '基本每股收益', '每股净资产', '净利润']
+
+
+def _scan_financial_batches(files, stocks):
+    """
+    用 pyarrow.dataset 一次扫描全部批次CSV
+    
+    只解析需要的列, 并在扫描时按股票代码过滤, 各文件由 Arrow 线程池并行解析。
+    批次文件结构不一致等导致扫描失败时返回 None, 由调用方逐个文件读取。
+    """
+    if not files:
+        return None
+    try:
+        csv_format = pads.CsvFileFormat(
+            convert_options=pacsv.ConvertOptions(
+                column_types={'code': pa.string(), '报告期': pa.string()}))
+        dataset = pads.dataset(files, format=csv_format)
+        table = dataset.to_table(columns=FUNDAMENTAL_COLUMNS,
+                                 filter=pc.field('code').isin(stocks))
+        return table.to_pandas()
+    except Exception as e:
+        print(f"  pyarrow 扫描失败, 逐个文件读取: {e}")
+        return None
+
+
 def get_fundamental_data():
     """从本地CSV获取基本面数据"""
     print("获取基本面数据...")
@@ -104,30 +166,36 @@ def get_fundamental_data():
     
     files = glob.glob(str(DATA_DIR / "a_stock_financial_batch*.csv"))
     
-    all_data = []
-    for f in files:
-        try:
-            df = pd.read_csv(f, usecols=['code', '报告期', '净资产收益率', '销售净利率', '销售毛利率', '基本每股收益', '每股净资产', '净利润'])
-            matched = df[df['code'].astype(str).isin(stocks)]
-            if len(matched) > 0:
-                all_data.append(matched)
-        except:
-            pass
-    
-    if not all_data:
+    df = _scan_financial_batches(files, stocks) if HAS_PYARROW else None
+    if df is None:
+        all_data = []
+        for f in files:
+            try:
+                df = pd.read_csv(f, usecols=FUNDAMENTAL_COLUMNS)
+                matched = df[df['code'].astype(str).isin(stocks)]
+                if len(matched) > 0:
+                    all_data.append(matched)
+            except:
+                pass
+        
+        if not all_data:
+            return {}
+        
+        df = pd.concat(all_data, ignore_index=True)
+    elif df.empty:
         return {}
     
-    df = pd.concat(all_data, ignore_index=True)
     latest = df.sort_values('报告期', ascending=False).drop_duplicates('code')
     
+    def col(name):
+        # 按列取值, 不为每行构造 Series; 缺列时整列为 'N/A'
+        return latest[name] if name in latest.columns else ['N/A'] * len(latest)
+    
     result = {}
-    for _, row in latest.iterrows():
-        code = str(row['code'])
-        roe = row.get('净资产收益率', 'N/A')
-        npm = row.get('销售净利率', 'N/A')
-        gpm = row.get('销售毛利率', 'N/A')
-        eps = row.get('基本每股收益', 'N/A')
-        bvps = row.get('每股净资产', 'N/A')
+    for code, roe, npm, gpm, eps, bvps in zip(
+            latest['code'], col('净资产收益率'), col('销售净利率'),
+            col('销售毛利率'), col('基本每股收益'), col('每股净资产')):
+        code = str(code)
         
         # 处理ROE格式
         if isinstance(roe, str) and '%' in roe:
@@ -146,20 +214,31 @@ def get_fundamental_data():
     return result
 
 # ========== 获取分红数据 ==========
+def _fetch_dividend(code):
+    """线程池任务: 获取单只股票最新的分红说明 (无记录时返回 None)"""
+    try:
+        df = ak.stock_dividend_cninfo(symbol=code)
+        if df is not None and len(df) > 0:
+            latest = df.iloc[0]
+            return latest.get('实施方案分红说明', 'N/A')
+    except:
+        return 'N/A'
+    return None
+
+
 def get_dividend_data():
     """获取分红数据"""
     print("获取分红数据...")
     stocks = [code for code, _ in WATCHLIST]
     
+    # 各股票的接口请求相互独立, 并行发出 (map 保持自选股顺序)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        outcomes = list(executor.map(_fetch_dividend, stocks))
+    
     dividend_data = {}
-    for code in stocks:
-        try:
-            df = ak.stock_dividend_cninfo(symbol=code)
-            if df is not None and len(df) > 0:
-                latest = df.iloc[0]
-                dividend_data[code] = latest.get('实施方案分红说明', 'N/A')
-        except:
-            dividend_data[code] = 'N/A'
+    for code, text in zip(stocks, outcomes):
+        if text is not None:
+            dividend_data[code] = text
     
     return dividend_data
 
@@ -4,7 +4,6 @@
 """
 import akshare as ak
 import baostock as bs
-import requests
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
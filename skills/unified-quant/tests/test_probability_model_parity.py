@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the vectorized WinProbabilityModel.
+
+The entry and exit statistics are compared with the original implementation
+(boolean-mask copy + dropna for entries, a per-row iloc loop for exits),
+including the column side effects that make strategy order matter.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import TestCase, main
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional scientific stack
+    raise unittest.SkipTest("numpy/pandas not installed")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from probability_model import WinProbabilityModel
+
+STRATEGIES = ["breakout", "momentum", "reversal"]
+
+
+def make_frame(rows=250, seed=5, with_gaps=False):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    df = pd.DataFrame({
+        'date': pd.date_range("2023-01-01", periods=rows, freq="B"),
+        'close': close,
+        'volume': rng.integers(1000, 9000, rows).astype(float),
+    })
+    if with_gaps:
+        df.loc[[30, 31, 120], 'volume'] = np.nan
+    return df
+
+
+# ---- 原实现 (参考) ----
+
+def ref_entry(df, signal_type):
+    if signal_type == "breakout":
+        df['high_20'] = df['close'].rolling(20).max()
+        df['breakout_signal'] = df['close'] > df['high_20'].shift(1)
+        df['future_return'] = df['close'].shift(-5) / df['close'] - 1
+        signals = df[df['breakout_signal']].dropna()
+    elif signal_type == "momentum":
+        df['ma5'] = df['close'].rolling(5).mean()
+        df['ma20'] = df['close'].rolling(20).mean()
+        df['momentum_signal'] = df['ma5'] > df['ma20']
+        signals = df[df['momentum_signal']].dropna()
+    else:
+        df['low_20'] = df['close'].rolling(20).min()
+        df['reversal_signal'] = df['close'] < df['low_20'] * 1.05
+        signals = df[df['reversal_signal']].dropna()
+
+    if len(signals) == 0:
+        return {"error": "No signals found"}
+
+    future_returns = signals['future_return'].dropna()
+    total = len(future_returns)
+    wins = (future_returns > 0).sum()
+    losses = (future_returns < 0).sum()
+    win_rate = wins / total * 100
+    margin = 1.96 * np.sqrt(win_rate * (100 - win_rate) / total)
+    return {
+        "strategy": signal_type,
+        "sample_size": total,
+        "win_rate": round(win_rate, 2),
+        "loss_rate": round(losses / total * 100, 2),
+        "avg_return_pct": round(future_returns.mean() * 100, 2),
+        "median_return_pct": round(future_returns.median() * 100, 2),
+        "confidence_interval_95": [round(win_rate - margin, 2), round(win_rate + margin, 2)],
+        "best_case_pct": round(future_returns.max() * 100, 2),
+        "worst_case_pct": round(future_returns.min() * 100, 2),
+    }
+
+
+def ref_exit(df, hold_days):
+    returns = []
+    for i in range(len(df) - hold_days):
+        returns.append((df['close'].iloc[i + hold_days] / df['close'].iloc[i] - 1) * 100)
+    returns = np.array(returns)
+    return {
+        "hold_days": hold_days,
+        "sample_size": len(returns),
+        "win_rate": round((returns > 0).sum() / len(returns) * 100, 2),
+        "avg_return_pct": round(returns.mean(), 2),
+        "median_return_pct": round(np.median(returns), 2),
+        "std_pct": round(returns.std(), 2),
+        "profit_factor": round(returns[returns > 0].sum() / abs(returns[returns < 0].sum()), 2)
+        if (returns < 0).sum() > 0 else 0,
+    }
+
+
+class TestEntryProbabilityParity(TestCase):
+    def assert_result(self, actual, expected):
+        if "error" in expected:
+            self.assertEqual(actual, expected)
+            return
+        for key, value in expected.items():
+            self.assertIn(key, actual)
+            if isinstance(value, str):
+                self.assertEqual(actual[key], value, key)
+            else:
+                np.testing.assert_allclose(actual[key], value, atol=1e-9, err_msg=key)
+
+    def run_sequence(self, df):
+        model = WinProbabilityModel()
+        model.load_historical_data("000001", df.copy())
+        ref_df = df.copy()
+        for strategy in STRATEGIES:
+            with self.subTest(strategy=strategy):
+                self.assert_result(
+                    model.calculate_entry_probability("000001", strategy),
+                    ref_entry(ref_df, strategy),
+                )
+
+    def test_strategy_sequence(self):
+        for seed in (1, 5, 9):
+            with self.subTest(seed=seed):
+                self.run_sequence(make_frame(seed=seed))
+
+    def test_nan_in_other_columns_drops_signal_rows(self):
+        self.run_sequence(make_frame(with_gaps=True))
+
+    def test_repeated_evaluation_is_stable(self):
+        df = make_frame()
+        model = WinProbabilityModel()
+        model.load_historical_data("000001", df.copy())
+        first = model.get_optimal_strategy("000001")
+        self.assertEqual(model.get_optimal_strategy("000001"), first)
+
+    def test_unknown_signal_type(self):
+        model = WinProbabilityModel()
+        model.load_historical_data("000001", make_frame())
+        self.assertIn("error", model.calculate_entry_probability("000001", "unknown"))
+
+
+class TestExitProbabilityParity(TestCase):
+    def test_hold_days(self):
+        for seed in (2, 4):
+            df = make_frame(seed=seed)
+            model = WinProbabilityModel()
+            model.load_historical_data("000001", df)
+            for hold_days in (1, 5, 20):
+                with self.subTest(seed=seed, hold_days=hold_days):
+                    actual = model.calculate_exit_probability("000001", hold_days)
+                    expected = ref_exit(df, hold_days)
+                    for key, value in expected.items():
+                        np.testing.assert_allclose(actual[key], value, atol=1e-9, err_msg=key)
+
+    def test_no_losses(self):
+        df = pd.DataFrame({'close': np.linspace(10, 20, 40)})
+        model = WinProbabilityModel()
+        model.load_historical_data("000001", df)
+        actual = model.calculate_exit_probability("000001", 5)
+        self.assertEqual(actual["profit_factor"], ref_exit(df, 5)["profit_factor"])
+
+    def test_insufficient_data(self):
+        model = WinProbabilityModel()
+        model.load_historical_data("000001", make_frame(rows=12))
+        self.assertEqual(model.calculate_exit_probability("000001", 5), {"error": "Insufficient data"})
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,8 @@
 功能: 数据验证 + 自动选股 + 论文引用 + 概率模型 + PDF报告 + QQ发送
 """
 import sys
-import json
 import os
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
@@ -17,6 +17,7 @@ from probability_model import WinProbabilityModel
 from paper_citation import PaperCitation, RESEARCH_TOPICS
 from report_generator import ReportGenerator
 from data_fetcher import StockDataFetcher
+from json_io import dump_json
 
 
 class UnifiedQuantSystem:
@@ -106,12 +107,14 @@ class UnifiedQuantSystem:
         # Step 3: 生成摘要
         print("\n📋 Step 3: 生成摘要")
         
+        # 一次遍历统计各类信号数量
+        signal_counts = Counter(s.get('signal') for s in results["signals"])
         results["summary"] = {
             "total_analyzed": len(stock_codes),
             "valid_stocks": len(signals),
-            "buy_signals": len([s for s in results["signals"] if s.get('signal') == '买入']),
-            "sell_signals": len([s for s in results["signals"] if s.get('signal') == '卖出']),
-            "hold_signals": len([s for s in results["signals"] if s.get('signal') == '观望']),
+            "buy_signals": signal_counts['买入'],
+            "sell_signals": signal_counts['卖出'],
+            "hold_signals": signal_counts['观望'],
         }
         
         print(f"   买入: {results['summary']['buy_signals']}")
@@ -130,8 +133,7 @@ class UnifiedQuantSystem:
         # 保存JSON结果
         if output_path:
             json_path = output_path.replace('.pdf', '.json')
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            dump_json(results, json_path)
             print(f"   💾 JSON: {json_path}")
         
         print("\n" + "=" * 60)
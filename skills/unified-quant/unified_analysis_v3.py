@@ -7,6 +7,7 @@ import sys
 import json
 import os
 import subprocess
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
@@ -27,30 +28,63 @@ class UnifiedQuantSystemV3:
         self.probability_model = WinProbabilityModel()
         self.citation = PaperCitation()
         self.report_generator = ReportGenerator()
-        
+        self._fundamental_table = None
+    
+    def _load_fundamental_table(self) -> dict:
+        """一次性读取 profit.csv 并为全部股票预计算基本面指标 (按代码缓存)"""
+        if self._fundamental_table is not None:
+            return self._fundamental_table
+        
+        data_dir = Path("/home/liujerry/金融数据/fundamentals/chuangye_full")
+        profit_file = data_dir / "profit.csv"
+        if not profit_file.exists():
+            self._fundamental_table = {}
+            return self._fundamental_table
+        
+        import pandas as pd
+        df = pd.read_csv(profit_file, usecols=lambda c: c in
+                         ('code', 'roeAvg', 'netProfit', 'gpMargin', 'MBRevenue'))
+        # 每只股票取首条记录, 与原先逐只匹配 iloc[0] 的语义一致
+        df = df.drop_duplicates('code', keep='first')
+        
+        def col(name):
+            # 缺列时按 0 计 (与原先 row.get(name, 0) 一致), 缺失值保留为 NaN
+            if name in df.columns:
+                return pd.to_numeric(df[name], errors='coerce')
+            return pd.Series(0.0, index=df.index)
+        
+        def fmt(values, spec, suffix=''):
+            # 缺失值显示为 'N/A', 不与真实的 0 混淆
+            return values.map(lambda v: 'N/A' if pd.isna(v) else f"{v:{spec}}{suffix}")
+        
+        # 整列向量化计算, 再按代码建索引
+        roe = fmt(col('roeAvg') * 100, '.1f', '%')
+        net_profit = fmt(col('netProfit'), '.2f')
+        gross_margin = fmt(col('gpMargin') * 100, '.1f', '%')
+        revenue = fmt(col('MBRevenue'), '.2f')
+        
+        table = {}
+        for code, r, n, g, v in zip(df['code'], roe, net_profit, gross_margin, revenue):
+            table[code] = {
+                'roe': r,
+                'net_profit': n,
+                'gross_margin': g,
+                'revenue': v,
+            }
+        # 全表构建完成后才缓存, 读取失败时下次调用会重试
+        self._fundamental_table = table
+        return table
+    
     def get_fundamental_data(self, stock_code: str) -> dict:
         """获取基本面数据"""
         try:
-            # 读取创业板财务数据
-            data_dir = Path("/home/liujerry/金融数据/fundamentals/chuangye_full")
-            profit_file = data_dir / "profit.csv"
+            # 读取创业板财务数据 (全表只读取一次)
+            table = self._load_fundamental_table()
             
-            if profit_file.exists():
-                import pandas as pd
-                df = pd.read_csv(profit_file)
-                
-                # 匹配股票代码
-                code = f"sz.{stock_code}" if not stock_code.startswith('sz.') else stock_code
-                match = df[df['code'] == code]
-                
-                if not match.empty:
-                    row = match.iloc[0]
-                    return {
-                        'roe': f"{row.get('roeAvg', 0) * 100:.1f}%",
-                        'net_profit': f"{row.get('netProfit', 0):.2f}",
-                        'gross_margin': f"{row.get('gpMargin', 0) * 100:.1f}%",
-                        'revenue': f"{row.get('MBRevenue', 0):.2f}",
-                    }
+            # 匹配股票代码
+            code = f"sz.{stock_code}" if not stock_code.startswith('sz.') else stock_code
+            if code in table:
+                return dict(table[code])
         except Exception as e:
             print(f"   基本面数据获取失败: {e}")
         
@@ -270,10 +304,11 @@ class UnifiedQuantSystemV3:
         signals.sort(key=lambda x: x['probability'], reverse=True)
         results["signals"] = signals
         
-        # 统计
-        buy_count = len([s for s in signals if s['signal'] == '买入'])
-        sell_count = len([s for s in signals if s['signal'] == '卖出'])
-        watch_count = len([s for s in signals if s['signal'] == '观望'])
+        # 统计 (一次遍历)
+        signal_counts = Counter(s['signal'] for s in signals)
+        buy_count = signal_counts['买入']
+        sell_count = signal_counts['卖出']
+        watch_count = signal_counts['观望']
         
         print(f"   买入: {buy_count} | 卖出: {sell_count} | 观望: {watch_count}")
         